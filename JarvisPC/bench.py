@@ -0,0 +1,823 @@
+"""
+Benchmarks for JarvisPC hot paths.
+
+Runs entirely locally: the OpenAI endpoints are replaced by the stand-in
+server in `stub_api.py`, so no API key or network is needed. Results are
+printed as JSON (or written with --out) so runs can be compared.
+
+  $ python bench.py tree --sizes 1000,10000,100000
+  $ python bench.py --out e2e.json e2e --runs 20 --latency 300
+
+  tree    Synthetic Start Menu / Program Files / Documents trees of the given
+          sizes: build_app_index (cold and incremental), FileIndex builds,
+          find_best_app, resolve_target and the crawl-based _search.
+  e2e     The full command path: simulated hotkey, synthetic mic audio,
+          pipeline, stub transcription + chat with configurable latency,
+          dispatch against a synthetic tree. Launches are recorded, not run.
+  nlu     Prompt size and chat latency with a large synthetic intent catalog:
+          the full catalog in every prompt vs the top-k shortlist.
+  tts     Speech queue with the silent stub backend: time to first audio
+          (cached phrase vs synthesized), how fast a new command cuts off a
+          long reply, and how soon a fresh reply plays behind stale ones.
+  hedge   Transcription + chat against a primary stub with a slow tail (and
+          optional failures), with and without hedging to an alternate stub:
+          tail latency, errors and per-backend win rates.
+  conn    Commands spaced out by idle gaps, each a hotkey press, capture,
+          transcription and chat: the stock client vs the pooled keep-alive
+          client pre-warmed on key press. Counts connections the stub saw
+          (it adds --connect-ms per new one) and the post-capture latency.
+  audio   Transcription upload: legacy temp-file WAV vs in-memory
+          wav / wav16 / flac, reporting bytes sent and end-to-end latency.
+  mic     MicStream fed by a synthetic real-time source: how much speech
+          onset the pre-roll keeps and how fast VAD closes the phrase.
+  ws      ui_server fan-out load test: many local websocket clients
+          receiving a paced burst of POSTed events. A few stop reading for
+          --stall seconds behind tiny socket buffers, so they really back up; the hub
+          should drop their oldest events rather than delay anyone else.
+  ui      Tk log window: push tens of thousands of lines through ui_log and
+          time the drain ticks, batched vs the old per-line inserts.
+          Needs a display.
+"""
+
+import argparse
+import contextlib
+import json
+import math
+import os
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+from stub_api import start_stub
+
+
+def _import_main(base_url):
+    """Import main.py pointed at the stub server."""
+    os.environ["OPENAI_BASE_URL"] = base_url
+    os.environ.setdefault("OPENAI_API_KEY", "stub")
+    os.environ.setdefault("JARVIS_CACHE_DIR", tempfile.mkdtemp(prefix="jarvis-bench-"))
+    import main
+    return main
+
+
+def _summary(samples_ms):
+    s = sorted(samples_ms)
+    return {"runs": len(s), "mean_ms": round(statistics.fmean(s), 2),
+            "p50_ms": round(s[len(s) // 2], 2), "max_ms": round(s[-1], 2)}
+
+
+def synthetic_speech(seconds=3.0, rate=44100, seed=0):
+    """Speech-like test signal (modulated tones + noise) as sr.AudioData."""
+    import speech_recognition as sr
+    rnd = random.Random(seed)
+    n = int(seconds * rate)
+    frames = bytearray()
+    for i in range(n):
+        t = i / rate
+        env = 0.5 + 0.5 * math.sin(2 * math.pi * 3 * t)
+        v = env * (0.5 * math.sin(2 * math.pi * 180 * t) + 0.3 * math.sin(2 * math.pi * 720 * t))
+        v += rnd.uniform(-0.05, 0.05)
+        frames += int(max(-1.0, min(1.0, v)) * 12000).to_bytes(2, "little", signed=True)
+    return sr.AudioData(bytes(frames), rate, 2)
+
+
+class SyntheticSource:
+    """Stand-in for an opened sr.Microphone that plays a scripted signal.
+
+    `script` is a list of (seconds, amplitude) segments: amplitude 0 is
+    near-silence, larger values a tone loud enough to count as speech.
+    speak() injects more speech at the current position, so a long-running
+    source can serve several utterances. Reads block for the chunk's
+    duration like a real device (speed > 1 plays faster than real time).
+    """
+    SAMPLE_WIDTH = 2
+
+    def __init__(self, script=(), rate=16000, chunk=512, speed=1.0, seed=0):
+        self.SAMPLE_RATE, self.CHUNK = rate, chunk
+        self.speed = speed
+        self.rnd = random.Random(seed)
+        self.segments = []  # (first sample, end sample, amplitude)
+        self.pos = 0
+        at = 0
+        for seconds, amp in script:
+            n = int(seconds * rate)
+            if amp: self.segments.append((at, at + n, amp))
+            at += n
+        self.started = None
+        self.lock = threading.Lock()
+        self.stream = self
+
+    def clock(self):
+        """Seconds of audio delivered so far."""
+        return self.pos / self.SAMPLE_RATE
+
+    def speak(self, seconds, amp=6000, delay=0.0):
+        with self.lock:
+            start = self.pos + int(delay * self.SAMPLE_RATE)
+            self.segments.append((start, start + int(seconds * self.SAMPLE_RATE), amp))
+
+    def read(self, n):
+        if self.started is None:
+            self.started = time.perf_counter()
+        with self.lock:
+            segs = [sg for sg in self.segments if sg[1] > self.pos]
+            self.segments = segs
+        out = bytearray()
+        rate = self.SAMPLE_RATE
+        for i in range(self.pos, self.pos + n):
+            amp = next((a for s0, s1, a in segs if s0 <= i < s1), 0)
+            v = amp * math.sin(2 * math.pi * 220 * i / rate) + self.rnd.uniform(-40, 40)
+            out += int(max(-32768, min(32767, v))).to_bytes(2, "little", signed=True)
+        self.pos += n
+        # pace reads against the wall clock like a real capture device
+        due = self.started + self.clock() / self.speed
+        time.sleep(max(0.0, due - time.perf_counter()))
+        return bytes(out)
+
+
+def bench_mic(args):
+    main = _import_main("http://127.0.0.1:9/v1")
+    results = []
+    for run in range(args.runs):
+        # 1 s room noise, 1.2 s speech, then silence; the "key" fires 0.2 s
+        # after speech starts, i.e. the user talked slightly before pressing
+        src = SyntheticSource([(1.0, 0), (1.2, 6000), (3.0, 0)], seed=run)
+        mic = main.MicStream(src, preroll_s=args.preroll).start()
+        while src.clock() < 1.2:
+            time.sleep(0.005)
+        t0 = time.perf_counter()
+        audio = mic.record()
+        took = time.perf_counter() - t0
+        mic.stop()
+        width = audio.sample_width
+        step = src.CHUNK * width
+        data = audio.frame_data
+        loud = sum(main._rms(data[i:i + step], width) > mic.threshold()
+                   for i in range(0, len(data), step))
+        got = len(data) / (audio.sample_rate * width)
+        # 1.2 s of speech in total, 0.2 s of it before the key press
+        results.append({"captured_s": round(got, 3),
+                        "speech_captured_s": round(loud * src.CHUNK / src.SAMPLE_RATE, 3),
+                        "record_s": round(took, 3),
+                        "end_detect_ms": round((took - 1.0) * 1000, 1),  # speech ended 1.0 s after key
+                        "ambient": round(mic.ambient or 0, 1)})
+    return {"bench": "mic", "preroll_s": args.preroll, "vad_pause_s": main.VAD_PAUSE_S,
+            "results": results}
+
+
+def _serve_ui(port):
+    """Run ui_server in a background thread. Returns (module, uvicorn server)."""
+    import uvicorn
+    # ui_server serves ./ui relative to the working directory (the repo root)
+    os.chdir(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    import ui_server
+    server = uvicorn.Server(uvicorn.Config(ui_server.app, host="127.0.0.1", port=port,
+                                           log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+    return ui_server, server
+
+
+def bench_ws(args):
+    import asyncio
+    import http.client
+    import socket
+    import websockets
+    ui_server, server = _serve_ui(args.port)
+    n, url = args.events, f"ws://127.0.0.1:{args.port}/ws"
+    done_at, received, out_of_order = [], [], 0
+    slow_ports, disconnected = set(), []
+
+    async def client(slow, connected):
+        nonlocal out_of_order
+        sock = None
+        if slow:  # tiny buffers, so the backlog lands in the hub's queue
+            sock = socket.socket()
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4096)
+            sock.connect(("127.0.0.1", args.port))
+            slow_ports.add(sock.getsockname()[1])
+        # no compression: deflate would shrink the padding to almost nothing
+        async with websockets.connect(url, max_size=None, sock=sock, ping_interval=None,
+                                      compression=None, max_queue=1 if slow else 16) as ws:
+            connected.release()
+            if slow:  # stop reading for a while (under SEND_TIMEOUT_S), then catch up
+                await asyncio.sleep(args.stall)
+            last, count = -1, 0
+            while last < n - 1:
+                try:
+                    msg = json.loads(await ws.recv())
+                except websockets.ConnectionClosed:  # stalled past SEND_TIMEOUT_S
+                    disconnected.append(slow)
+                    break
+                if msg["seq"] <= last: out_of_order += 1
+                last, count = msg["seq"], count + 1
+            if not slow:
+                done_at.append(time.perf_counter())
+            received.append((slow, count))
+
+    def shrink_slow_sends():
+        # the server side of each slow connection gets a tiny send buffer too
+        for conn in list(server.server_state.connections):
+            transport = conn.transport
+            if transport.get_extra_info("peername")[1] in slow_ports:
+                transport.get_extra_info("socket").setsockopt(
+                    socket.SOL_SOCKET, socket.SO_SNDBUF, 4096)
+
+    def publish():
+        conn = http.client.HTTPConnection("127.0.0.1", args.port)
+        pad = "x" * args.event_bytes
+        start = time.perf_counter()
+        for i in range(n):
+            if args.rate:  # paced, so only the stalled clients fall behind
+                time.sleep(max(0.0, start + i / args.rate - time.perf_counter()))
+            body = json.dumps({"type": "info", "text": f"event {i} {pad}", "seq": i})
+            conn.request("POST", "/event", body, {"Content-Type": "application/json"})
+            conn.getresponse().read()
+        conn.close()
+
+    async def run():
+        connected = asyncio.Semaphore(0)
+        tasks = [asyncio.create_task(client(i < args.slow, connected)) for i in range(args.clients)]
+        for _ in tasks:
+            await connected.acquire()
+        while ui_server.hub.stats()["clients"] < args.clients:
+            await asyncio.sleep(0.01)
+        shrink_slow_sends()
+        t0 = time.perf_counter()
+        await asyncio.to_thread(publish)
+        published = time.perf_counter()
+        await asyncio.wait_for(asyncio.gather(*tasks), 120)
+        return t0, published
+
+    ui_server.hub.queue_size = args.queue
+    t0, published = asyncio.run(run())
+    server.should_exit = True
+    slow_counts = [c for s, c in received if s]
+    fast_counts = [c for s, c in received if not s]
+    fast = sorted((t - t0) * 1000 for t in done_at)
+    return {"bench": "ws", "clients": args.clients, "slow_clients": args.slow, "events": n,
+            "publish_ms": round((published - t0) * 1000, 1),
+            "fast_client_done_ms": {"p50": round(fast[len(fast) // 2], 1),
+                                    "p99": round(fast[int(len(fast) * 0.99) - 1], 1),
+                                    "max": round(fast[-1], 1)},
+            "event_bytes": args.event_bytes, "client_queue": args.queue,
+            "deliveries": sum(c for _, c in received), "out_of_order": out_of_order,
+            "fast_client_received": {"min": min(fast_counts, default=None),
+                                     "max": max(fast_counts, default=None)},
+            "slow_client_received": {"min": min(slow_counts, default=None),
+                                     "max": max(slow_counts, default=None)},
+            "disconnected": {"fast": disconnected.count(False), "slow": disconnected.count(True)},
+            "hub": ui_server.hub.stats()}
+
+
+def _legacy_drain(self):
+    # the original JarvisUI._drain_queue: one insert + see per line, no trimming
+    import queue
+    main = sys.modules["main"]
+    while True:
+        try: line = main.UI_EVENTS.get_nowait()
+        except queue.Empty: break
+        self.text.configure(state="normal")
+        self.text.insert("end", line + "\n")
+        self.text.see("end")
+        self.text.configure(state="disabled")
+    self.root.after(60, self._drain_queue)
+
+
+def bench_ui(args):
+    import types
+    main = _import_main("http://127.0.0.1:9/v1")
+    results = {}
+    for mode in ("batched", "legacy"):
+        ui = main.JarvisUI()
+        drain = types.MethodType(_legacy_drain, ui) if mode == "legacy" else ui._drain_queue
+        ticks = []
+
+        def timed(drain=drain, ticks=ticks):
+            t0 = time.perf_counter()
+            drain()
+            ticks.append((time.perf_counter() - t0) * 1000)
+        ui._drain_queue = timed
+        main.UI_DROPPED["n"] = 0
+        done = threading.Event()
+
+        def produce():
+            per_ms = args.rate / 1000
+            t0 = time.perf_counter()
+            for i in range(args.lines):
+                main.ui_log(f"[bench] line {i} " + "x" * 60)
+                if i % 100 == 99:  # hold the requested line rate
+                    time.sleep(max(0.0, (i + 1) / per_ms / 1000 - (time.perf_counter() - t0)))
+            done.set()
+
+        def check():
+            if done.is_set() and main.UI_EVENTS.empty():
+                ui.root.after(200, ui.root.quit)
+            else:
+                ui.root.after(50, check)
+        t0 = time.perf_counter()
+        threading.Thread(target=produce, daemon=True).start()
+        ui.root.after(50, check)
+        ui.loop()
+        elapsed = time.perf_counter() - t0
+        lines_kept = int(ui.text.index("end-1c").split(".")[0]) - 1
+        ui.root.destroy()
+        t = sorted(ticks)
+        results[mode] = {"elapsed_s": round(elapsed, 2), "ticks": len(t),
+                         "tick_p50_ms": round(t[len(t) // 2], 2), "tick_max_ms": round(t[-1], 2),
+                         "lines_in_widget": lines_kept}
+    return {"bench": "ui", "lines": args.lines, "rate_per_s": args.rate,
+            "scrollback": main.UI_SCROLLBACK, "results": results}
+
+
+WORDS = ("alpha bravo budget report invoice design studio render project draft final "
+         "notes meeting client photo scan tax plan site model review archive backup "
+         "media sound video code tools suite viewer editor player manager").split()
+VENDORS = ("Acme Globex Initech Umbrella Hooli Stark Wayne Wonka Tyrell Cyberdyne").split()
+
+
+def make_tree(root, files, seed=0):
+    """Synthetic Windows-like layout under root with about `files` files.
+
+    Returns {"start": dir, "programs": dir, "documents": dir}. A handful of
+    well-known targets are planted so lookups have something to find.
+    """
+    rnd = random.Random(seed)
+    dirs = {k: os.path.join(root, k) for k in ("start", "programs", "documents")}
+    name = lambda k: " ".join(rnd.choice(WORDS) for _ in range(k)).title()
+
+    def put(folder, fname):
+        os.makedirs(folder, exist_ok=True)
+        open(os.path.join(folder, fname), "w").close()
+
+    n_start, n_prog = max(20, files // 20), files * 35 // 100
+    for i in range(n_start):
+        put(os.path.join(dirs["start"], rnd.choice(VENDORS)), f"{name(2)} {i}.lnk")
+    for i in range(n_prog):
+        folder = os.path.join(dirs["programs"], rnd.choice(VENDORS), f"{name(1)} {i // 50}",
+                              rnd.choice(["bin", "lib", "resources", "plugins"]))
+        put(folder, f"{name(1).lower()}{i}.{rnd.choice(['exe', 'dll', 'dll', 'json'])}")
+    for i in range(max(0, files - n_start - n_prog)):
+        depth = rnd.randint(0, 4)
+        folder = os.path.join(dirs["documents"], *(name(1) for _ in range(depth)))
+        put(folder, f"{name(3)} {i}.{rnd.choice(['pdf', 'docx', 'xlsx', 'txt', 'png'])}")
+    put(os.path.join(dirs["start"], "Adobe"), "Adobe Photoshop 2024.lnk")
+    put(os.path.join(dirs["programs"], "Adobe", "Photoshop 2024"), "Photoshop.exe")
+    put(os.path.join(dirs["programs"], "Google", "Chrome", "Application"), "chrome.exe")
+    put(os.path.join(dirs["documents"], "Finance", "2025"), "Quarterly Budget Report.xlsx")
+    return dirs
+
+
+def _point_main_at(main, dirs):
+    main.SEARCH_DIRS[:] = [dirs["start"], dirs["documents"]]
+    main.PROGRAM_DIRS[:] = [dirs["programs"]]
+    main.APP_DIR_CACHE = {}
+    main.APP_MATCHER = None
+    main.FILE_INDEX = main.FileIndex(main.SEARCH_DIRS)
+
+
+def _ptt_press(main):
+    """SPACE down, as on_press handles it, without pynput or a display."""
+    if not main.PTT["pressed"]:
+        main.PTT["pressed"] = True
+        main._trigger()
+
+
+def _ptt_release(main):
+    main.PTT["pressed"] = False
+
+
+def _start_loop(main, timeout_s=5.0):
+    """Run main.jarvis_loop in the background with a no-op hotkey listener.
+
+    pynput needs a display, so a stub takes its place; presses are driven
+    with _ptt_press/_ptt_release instead. Fails if the loop dies or the
+    pipeline isn't up within timeout_s.
+    """
+    keyboard = type(sys)("pynput.keyboard")
+    keyboard.Listener = lambda **kw: type("Listener", (), {"start": lambda self: None})()
+    pynput = type(sys)("pynput")
+    pynput.keyboard = keyboard
+    sys.modules.update({"pynput": pynput, "pynput.keyboard": keyboard})
+    loop = threading.Thread(target=main.jarvis_loop, daemon=True)
+    loop.start()
+    deadline = time.perf_counter() + timeout_s
+    while main.PIPELINE is None:
+        if not loop.is_alive():
+            raise RuntimeError("jarvis_loop exited before the pipeline started")
+        if time.perf_counter() > deadline:
+            raise RuntimeError(f"pipeline not up after {timeout_s:.0f} s")
+        time.sleep(0.01)
+
+
+def _timed(fn, runs):
+    samples = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    return _summary(samples)
+
+
+def bench_tree(args):
+    main = _import_main("http://127.0.0.1:9/v1")
+    out = []
+    for size in (int(x) for x in args.sizes.split(",")):
+        root = tempfile.mkdtemp(prefix=f"jarvis-tree-{size}-")
+        t0 = time.perf_counter()
+        dirs = make_tree(root, size)
+        gen_s = time.perf_counter() - t0
+        _point_main_at(main, dirs)
+        r = {"files": size, "generate_s": round(gen_s, 2)}
+        r["build_app_index_cold"] = _timed(main.build_app_index, 1)
+        r["build_app_index_warm"] = _timed(main.build_app_index, args.runs)
+        r["apps"] = len(main.APP_INDEX)
+        r["file_index_cold"] = _timed(main.FILE_INDEX.refresh, 1)
+        r["file_index_warm"] = _timed(main.FILE_INDEX.refresh, args.runs)
+        queries = ["photoshop", "chrome", "word", "acme studio", "no such app"]
+        r["find_best_app"] = {q: _timed(lambda q=q: main.find_best_app(q), args.runs) for q in queries}
+        targets = [("budget report", []), ("invoice", ["final"]), ("zzqx", [])]
+        r["resolve_target"] = {t: _timed(lambda t=t, h=h: main.resolve_target(t, h), args.runs)
+                               for t, h in targets}
+        pats = main._patterns("budget report", [])
+        r["_search_documents"] = _timed(lambda: main._search(dirs["documents"], pats), 1)
+        out.append(r)
+        if not args.keep:
+            import shutil
+            shutil.rmtree(root, ignore_errors=True)
+    return {"bench": "tree", "results": out}
+
+
+class _HeadlessUI:
+    def set_listening(self, on):
+        pass
+
+
+def bench_e2e(args):
+    server, state, url = start_stub(latency_ms=args.latency, jitter_ms=args.jitter)
+    main = _import_main(url)
+    dirs = make_tree(tempfile.mkdtemp(prefix="jarvis-e2e-"), args.files)
+    _point_main_at(main, dirs)
+    main.build_app_index()
+    main.FILE_INDEX.refresh()
+    main.ACTIONS["open_downloads"] = {"type": "open", "path": dirs["documents"]}
+    main.reload_actions = lambda: None
+    main.INTENT_MATCHER = main.IntentMatcher(main.ACTIONS)
+    if not args.nlu_cache:
+        main.NLU_CACHE.size = 0  # every chat command goes to the stub
+
+    launched = []
+    class _Popen:  # record launches instead of opening windows
+        def __init__(self, cmd, *a, **kw):
+            launched.append(cmd)
+    main.subprocess = type(sys)("subprocess_stub")
+    main.subprocess.Popen = _Popen
+    main.ui = _HeadlessUI()
+    src = SyntheticSource([(0.5, 0)])
+    main.MIC = main.MicStream(src).start()
+
+    finished = []
+    done = threading.Event()
+    real_finish = main.TRACER.finish
+    def finish(trace, outcome):
+        real_finish(trace, outcome)
+        finished.append({"outcome": outcome, **{k: round(v, 1) for k, v in trace.spans.items()}})
+        done.set()
+    main.TRACER.finish = finish
+    _start_loop(main)
+
+    commands = ["open downloads", "open budget report", "open photoshop"]
+    for i in range(args.runs):
+        state.transcript = commands[i % len(commands)]
+        done.clear()
+        src.speak(args.speech)
+        _ptt_press(main)
+        _ptt_release(main)
+        if not done.wait(30):
+            finished.append({"outcome": "stuck"})
+        time.sleep(0.2)
+    server.shutdown()
+    by_cmd = {}
+    for i, f in enumerate(finished):
+        by_cmd.setdefault(commands[i % len(commands)], []).append(f)
+    summary = {}
+    for cmd, runs in by_cmd.items():
+        stages = {k for r in runs for k in r if k != "outcome"}
+        summary[cmd] = {"outcomes": sorted({r["outcome"] for r in runs}),
+                        **{k: _summary([r[k] for r in runs if k in r]) for k in sorted(stages)}}
+    return {"bench": "e2e", "latency_ms": args.latency, "speech_s": args.speech,
+            "files": args.files, "runs": args.runs, "launches": len(launched),
+            "api_requests": state.snapshot()["requests"], "commands": summary}
+
+
+def bench_audio(args):
+    server, state, url = start_stub(latency_ms=args.latency)
+    main = _import_main(url)
+    audio = synthetic_speech(args.seconds)
+
+    def legacy(audio_data):
+        # the original path: WAV written to a temp file, reopened and uploaded
+        with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as tmp:
+            tmp.write(audio_data.get_wav_data()); tmp_path = tmp.name
+        try:
+            with open(tmp_path, "rb") as f:
+                return main.get_client().audio.transcriptions.create(model="whisper-1", file=f).text
+        finally:
+            os.remove(tmp_path)
+
+    paths = {"legacy_tempfile_wav": legacy}
+    for fmt in ("wav", "wav16", "flac"):
+        paths[fmt] = lambda a, fmt=fmt: main.transcribe_audio(a, fmt)
+    results = {}
+    for name, fn in paths.items():
+        fn(audio)  # warm up the connection
+        state.reset()
+        samples = []
+        for _ in range(args.runs):
+            t0 = time.perf_counter()
+            fn(audio)
+            samples.append((time.perf_counter() - t0) * 1000)
+        sent = state.snapshot()["bytes_in"].get("/v1/audio/transcriptions", 0)
+        results[name] = {"bytes_sent": sent // args.runs, **_summary(samples)}
+    server.shutdown()
+    return {"bench": "audio", "seconds": args.seconds, "latency_ms": args.latency,
+            "results": results}
+
+
+_NOUNS = ["budget", "invoice", "photos", "music", "project", "backup", "steam", "spotify",
+          "notes", "reports", "drivers", "recipes", "taxes", "screenshots", "videos", "blender",
+          "unity", "python", "vpn", "printer", "calendar", "mail", "contracts", "resume",
+          "timesheet", "garden", "travel", "school", "games", "design", "slides", "podcast",
+          "camera", "scanner", "archive", "templates", "clients", "server", "logs", "wallpapers"]
+_QUALS = ["", "old", "new", "shared", "work", "home", "2023", "2024", "draft", "final",
+          "team", "personal", "monthly", "weekly", "client"]
+
+
+def synthetic_catalog(n, seed=0):
+    """n plausible actions.yaml intents with descriptions and trigger phrases."""
+    rnd = random.Random(seed)
+    combos = [(noun, q) for noun in _NOUNS for q in _QUALS]
+    rnd.shuffle(combos)
+    actions = {}
+    for noun, q in combos[:n]:
+        words = [q, noun] if q else [noun]
+        name = "open_" + "_".join(words)
+        actions[name] = {"type": "open", "path": f"C:\\Data\\{'_'.join(words)}",
+                         "description": f"{' '.join(words)} folder",
+                         "triggers": [f"show {' '.join(words)}", f"{' '.join(words)} folder"]}
+    return actions
+
+
+def bench_nlu(args):
+    server, state, url = start_stub(latency_ms=args.latency, token_ms=args.token_ms)
+    main = _import_main(url)
+    rnd = random.Random(1)
+    main.ACTIONS = synthetic_catalog(args.intents)
+    main.SYSTEM_PROMPT = main.build_system_prompt()
+    main.INTENT_INDEX = main.IntentIndex(main.ACTIONS)
+    main.NLU_CACHE.size = 0
+    picks = rnd.sample(sorted(main.ACTIONS), min(args.runs, len(main.ACTIONS)))
+    # paraphrases the fast path wouldn't catch, plus a few with no intent at all
+    utterances = [(f"could you pull up the {main.ACTIONS[i]['description']} thing", i) for i in picks]
+    utterances += [(t, None) for t in ("tell me a joke", "what time is it", "how are you")]
+    retrieval_ms, recall = [], 0
+    for text, intent in utterances:
+        t0 = time.perf_counter()
+        hits = [i for i, _ in main.INTENT_INDEX.top(text, args.topk)]
+        retrieval_ms.append((time.perf_counter() - t0) * 1000)
+        recall += intent in hits
+    results = {}
+    for mode, k in (("full", 0), ("topk", args.topk)):
+        main.NLU_TOPK = k
+        main.nlu_parse("warm up")
+        for st in main.PROMPT_STATS.values():
+            st.update(n=0, tokens=0, api_ms=0.0)
+        samples = []
+        for text, _ in utterances:
+            t0 = time.perf_counter()
+            main.nlu_parse(text)
+            samples.append((time.perf_counter() - t0) * 1000)
+        results[mode] = {"prompts": main.prompt_stats(), **_summary(samples)}
+    server.shutdown()
+    return {"bench": "nlu", "intents": len(main.ACTIONS), "topk": args.topk,
+            "latency_ms": args.latency, "token_ms": args.token_ms,
+            "retrieval": {"recall": round(recall / len(picks), 3), **_summary(retrieval_ms)},
+            "results": results}
+
+
+def bench_tts(args):
+    main = _import_main("http://127.0.0.1:9/v1")  # no API calls
+    backend = main.StubSpeech(startup_ms=args.startup, ms_per_char=args.ms_per_char)
+    speech = main.Speech()
+    threading.Thread(target=speech.run, args=(backend,), daemon=True).start()
+    while len(speech.phrases) < len(main.TTS_PHRASES):  # let it pre-synthesize
+        time.sleep(0.05)
+
+    def first_audio(text):
+        main.TRACER.samples.pop("tts_first_audio", None)
+        n = speech.counts["spoken"]
+        speech.say(text)
+        while speech.counts["spoken"] == n:
+            time.sleep(0.005)
+        return main.TRACER.samples["tts_first_audio"][0]
+
+    def interrupt_ms():
+        n = len(backend.spoken)
+        speech.say("This is a long chat reply that nobody wants to hear anymore. " * 3)
+        time.sleep(0.3 + args.startup / 1000)
+        t0 = time.perf_counter()
+        speech.interrupt()
+        while len(backend.spoken) <= n:
+            time.sleep(0.001)
+        return (time.perf_counter() - t0) * 1000
+
+    def fresh_reply_ms(stale):
+        # a reply is playing and replies to older commands are queued behind
+        # it when a new command answers
+        speech.say("A long chat reply that is still being read out. " * 3)
+        for i in range(stale):
+            speech.say(f"Old reply number {i}, still waiting to be read out.")
+        time.sleep(0.1 + args.startup / 1000)
+        speech.interrupt()
+        return first_audio("Fresh reply.")
+
+    cached = [first_audio("I couldn’t find budget report.") for _ in range(args.runs)]
+    fresh = [first_audio("Here's a reply nobody has said before.") for _ in range(args.runs)]
+    cut = [interrupt_ms() for _ in range(args.runs)]
+    behind = [fresh_reply_ms(args.stale) for _ in range(args.runs)]
+    # the old unbounded queue played every stale reply first
+    legacy = args.stale * (args.startup + len("Old reply number 0, still waiting to be read out.")
+                           * args.ms_per_char) + args.startup
+    return {"bench": "tts", "startup_ms": args.startup, "ms_per_char": args.ms_per_char,
+            "first_audio": {"cached_phrase": _summary(cached), "synthesized": _summary(fresh)},
+            "interrupt": _summary(cut),
+            "fresh_reply_behind_stale": {"stale": args.stale, **_summary(behind),
+                                         "legacy_estimate_ms": round(legacy, 1)},
+            "counts": speech.stats()}
+
+
+def bench_hedge(args):
+    primary, pstate, purl = start_stub(latency_ms=args.latency, jitter_ms=args.jitter,
+                                       tail_ms=args.tail, tail_p=args.tail_p, fail_p=args.fail_p)
+    alt, astate, aurl = start_stub(latency_ms=args.alt_latency, jitter_ms=args.jitter)
+    main = _import_main(purl)
+    main.NLU_CACHE.size = 0
+    audio = synthetic_speech(1.0)
+    results = {}
+    for mode in ("single", "hedged"):
+        for kind in ("asr", "nlu"):
+            model = "whisper-1" if kind == "asr" else "gpt-4o-mini"
+            backends = [main.Backend(kind, model, purl)]
+            if mode == "hedged":
+                backends.append(main.Backend.from_spec(kind, f"{model}@{aurl}"))
+            setattr(main, f"{kind.upper()}_BACKENDS", backends)
+        samples = {"asr": [], "nlu": []}
+        errors = {"asr": 0, "nlu": 0}
+        for i in range(args.runs):
+            for kind, fn in (("asr", lambda: main.transcribe_audio(audio, "wav16")),
+                             ("nlu", lambda: main.nlu_parse(f"open report {i}"))):
+                t0 = time.perf_counter()
+                try:
+                    fn()
+                except main.ApiError:
+                    errors[kind] += 1
+                samples[kind].append((time.perf_counter() - t0) * 1000)
+        pct = lambda v, p: round(main._pct(sorted(v), p), 1)
+        results[mode] = {kind: {"errors": errors[kind], **_summary(v), "p95_ms": pct(v, .95),
+                                "p99_ms": pct(v, .99)} for kind, v in samples.items()}
+        results[mode]["backends"] = main.backend_stats()
+    primary.shutdown(); alt.shutdown()
+    return {"bench": "hedge", "runs": args.runs, "primary": {"latency_ms": args.latency,
+            "tail_ms": args.tail, "tail_p": args.tail_p, "fail_p": args.fail_p},
+            "alternate": {"latency_ms": args.alt_latency}, "jitter_ms": args.jitter,
+            "deadlines_s": {"asr": main.ASR_DEADLINE_S, "nlu": main.NLU_DEADLINE_S},
+            "results": results}
+
+
+def bench_conn(args):
+    server, state, url = start_stub(latency_ms=args.latency, connect_ms=args.connect_ms)
+    main = _import_main(url)
+    from openai import OpenAI
+    main.NLU_CACHE.size = 0
+    audio = synthetic_speech(1.0)
+    results = {}
+    for mode in ("stock", "pooled_prewarm"):
+        # stock: the plain OpenAI() client, nothing done until capture ends
+        main.client = OpenAI(api_key="stub") if mode == "stock" else None
+        for b in main.ASR_BACKENDS + main.NLU_BACKENDS:
+            b._client = None
+        main.PREWARM_DEBOUNCE_S = 1e9 if mode == "stock" else 0.0
+        main.PREWARM["last"] = 0.0 if mode == "stock" else None
+        main.transcribe_audio(audio, "wav16")  # client created, first connection made
+        state.reset()
+        samples = {"transcribe": [], "nlu": [], "total": []}
+        for i in range(args.runs):
+            time.sleep(args.idle)
+            _ptt_press(main)
+            time.sleep(args.speech)  # user talking
+            _ptt_release(main)
+            t0 = time.perf_counter()
+            main.transcribe_audio(audio, "wav16")
+            t1 = time.perf_counter()
+            main.nlu_parse(f"open report {i}")
+            t2 = time.perf_counter()
+            samples["transcribe"].append((t1 - t0) * 1000)
+            samples["nlu"].append((t2 - t1) * 1000)
+            samples["total"].append((t2 - t0) * 1000)
+        snap = state.snapshot()
+        results[mode] = {"connections": snap["connections"], "requests": snap["requests"],
+                         **{k: _summary(v) for k, v in samples.items()}}
+    server.shutdown()
+    saved = results["stock"]["total"]["mean_ms"] - results["pooled_prewarm"]["total"]["mean_ms"]
+    return {"bench": "conn", "runs": args.runs, "idle_s": args.idle, "speech_s": args.speech,
+            "connect_ms": args.connect_ms, "latency_ms": args.latency,
+            "saved_ms_per_command": round(saved, 1), "results": results}
+
+
+def main_cli(argv=None):
+    ap = argparse.ArgumentParser(description="JarvisPC benchmarks")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("audio", help="transcription upload formats")
+    p.add_argument("--seconds", type=float, default=3.0)
+    p.add_argument("--runs", type=int, default=5)
+    p.add_argument("--latency", type=float, default=0.0, help="stub latency (ms)")
+    p.set_defaults(fn=bench_audio)
+    p = sub.add_parser("tree", help="indexing and lookups on synthetic trees")
+    p.add_argument("--sizes", default="1000,10000,100000", help="comma-separated file counts")
+    p.add_argument("--runs", type=int, default=5)
+    p.add_argument("--keep", action="store_true", help="keep the generated trees")
+    p.set_defaults(fn=bench_tree)
+    p = sub.add_parser("e2e", help="full command path against the stub API")
+    p.add_argument("--runs", type=int, default=9)
+    p.add_argument("--latency", type=float, default=300.0, help="stub latency (ms)")
+    p.add_argument("--jitter", type=float, default=50.0, help="stub jitter (ms)")
+    p.add_argument("--speech", type=float, default=0.8, help="seconds of speech per command")
+    p.add_argument("--files", type=int, default=5000, help="synthetic tree size")
+    p.add_argument("--nlu-cache", action="store_true", help="leave the NLU cache on")
+    p.set_defaults(fn=bench_e2e)
+    p = sub.add_parser("tts", help="speech queue: first audio, interruption, stale replies")
+    p.add_argument("--runs", type=int, default=5)
+    p.add_argument("--startup", type=float, default=150.0, help="stub synthesis latency (ms)")
+    p.add_argument("--ms-per-char", type=float, default=40.0, help="stub speaking rate")
+    p.add_argument("--stale", type=int, default=3, help="stale replies queued ahead")
+    p.set_defaults(fn=bench_tts)
+    p = sub.add_parser("hedge", help="deadlines, retries and hedging to an alternate backend")
+    p.add_argument("--runs", type=int, default=100)
+    p.add_argument("--latency", type=float, default=150.0, help="primary stub latency (ms)")
+    p.add_argument("--tail", type=float, default=3000.0, help="primary slow-tail latency (ms)")
+    p.add_argument("--tail-p", type=float, default=0.04, help="fraction of slow primary requests")
+    p.add_argument("--fail-p", type=float, default=0.02, help="fraction of primary requests failing")
+    p.add_argument("--alt-latency", type=float, default=250.0, help="alternate stub latency (ms)")
+    p.add_argument("--jitter", type=float, default=50.0)
+    p.set_defaults(fn=bench_hedge)
+    p = sub.add_parser("conn", help="pooled, pre-warmed API connections vs the stock client")
+    p.add_argument("--runs", type=int, default=5)
+    p.add_argument("--idle", type=float, default=6.0, help="seconds between commands")
+    p.add_argument("--speech", type=float, default=0.8, help="seconds the key is held")
+    p.add_argument("--connect-ms", type=float, default=150.0, help="stub handshake cost (ms)")
+    p.add_argument("--latency", type=float, default=100.0, help="stub latency (ms)")
+    p.set_defaults(fn=bench_conn)
+    p = sub.add_parser("nlu", help="full-catalog vs shortlisted NLU prompts")
+    p.add_argument("--intents", type=int, default=300, help="synthetic catalog size")
+    p.add_argument("--topk", type=int, default=8)
+    p.add_argument("--runs", type=int, default=20, help="utterances naming an intent")
+    p.add_argument("--latency", type=float, default=200.0, help="stub latency (ms)")
+    p.add_argument("--token-ms", type=float, default=50.0, help="stub latency per 1k prompt tokens (ms)")
+    p.set_defaults(fn=bench_nlu)
+    p = sub.add_parser("mic", help="pre-roll capture + VAD end-of-speech")
+    p.add_argument("--runs", type=int, default=3)
+    p.add_argument("--preroll", type=float, default=0.5)
+    p.set_defaults(fn=bench_mic)
+    p = sub.add_parser("ws", help="ui_server websocket fan-out")
+    p.add_argument("--clients", type=int, default=100)
+    p.add_argument("--slow", type=int, default=5, help="clients that stop reading for --stall seconds")
+    p.add_argument("--events", type=int, default=1000)
+    p.add_argument("--event-bytes", type=int, default=4096, help="padding per event")
+    p.add_argument("--queue", type=int, default=256, help="per-client hub queue size")
+    p.add_argument("--rate", type=float, default=100, help="events per second (0 = unpaced)")
+    p.add_argument("--stall", type=float, default=3.0, help="seconds the slow clients stop reading")
+    p.add_argument("--port", type=int, default=8788)
+    p.set_defaults(fn=bench_ws)
+    p = sub.add_parser("ui", help="Tk log rendering (needs a display)")
+    p.add_argument("--lines", type=int, default=50000)
+    p.add_argument("--rate", type=float, default=20000, help="lines per second")
+    p.set_defaults(fn=bench_ui)
+    ap.add_argument("--out", help="write JSON results to this file")
+    args = ap.parse_args(argv)
+    with contextlib.redirect_stdout(sys.stderr):  # keep stdout pure JSON
+        result = args.fn(args)
+    result["meta"] = {"python": sys.version.split()[0], "platform": sys.platform,
+                      "time": time.strftime("%Y-%m-%dT%H:%M:%S"), "args": vars(args) | {"fn": None}}
+    text = json.dumps(result, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text)
+    print(text)
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
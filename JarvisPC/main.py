@@ -1,49 +1,313 @@
-import os, sys, json, subprocess, yaml, time, tempfile, fnmatch, shutil
-import threading, queue
+import os, sys, io, re, math, json, subprocess, yaml, time, fnmatch, shutil
+import threading, queue, hashlib, asyncio, contextlib, contextvars, itertools
+import http.client, urllib.parse
+from array import array
+from collections import Counter, OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from dotenv import load_dotenv
-from pynput import keyboard
-import speech_recognition as sr
-from openai import OpenAI
-from rapidfuzz import process, fuzz
+# Heavy modules (openai, speech_recognition, pynput, rapidfuzz, pyttsx3) are
+# imported where they're first used so the window comes up right away.
+keyboard = None  # pynput.keyboard, imported by jarvis_loop
+
+# ──────────────────────────────────────────────────────────────────
+# Startup timing
+# ──────────────────────────────────────────────────────────────────
+T_START = time.perf_counter()
+STARTUP_MS = {}
+
+def startup_mark(phase):
+    """Record (and show) how long after launch a component became ready."""
+    STARTUP_MS[phase] = round((time.perf_counter() - T_START) * 1000, 1)
+    ui_log(f"[ready] {phase} +{STARTUP_MS[phase]:.0f} ms")
 
 # ────────────────────────────────────────────────────────────────────────
 # Optional: offline TTS
 # ──────────────────────────────────────────────────────────────────────
-try:
-    import pyttsx3
-    TTS = pyttsx3.init()
-except Exception:
-    TTS = None
-import queue, threading
+# say() queues (generation, text). Every hotkey press starts a new generation:
+# whatever is playing stops and replies queued for older commands are dropped.
+# Replies still pending when the worker gets to them are merged into one
+# utterance. Fixed phrases ("I couldn’t find", error messages) are synthesized
+# to WAV once, kept in the cache dir, and played straight from disk.
+TTS_BACKEND = os.getenv("JARVIS_TTS", "pyttsx3").lower()  # pyttsx3 | stub | off
+TTS_MAX_AGE_S = float(os.getenv("JARVIS_TTS_MAX_AGE", "15"))
+TTS_PHRASES = (
+    "I couldn’t find", "Tell me which app, file, or folder to open.", "Okay.",
+    "Okay, cancelled.", "Opening failed:", "That action failed:", "Something went wrong:",
+    "Transcription had a hiccup:", "Weird, I don't know how to open that.",
+    "That took too long",
+)
 
-TTS_QUEUE = queue.Queue()
+class Pyttsx3Speech:
+    """pyttsx3 (SAPI on Windows). Interrupts between words; WAV playback via winsound."""
+    def __init__(self):
+        import pyttsx3
+        self.engine = pyttsx3.init()
+        self.voice = f"pyttsx3:{self.engine.getProperty('voice')}:{self.engine.getProperty('rate')}"
+        self._started = self._interrupted = None
+        self.engine.connect("started-utterance", lambda name: self._started and self._started())
+        self.engine.connect("started-word", self._on_word)
 
-def tts_worker():
-    while True:
-        text = TTS_QUEUE.get()
-        if text is None:  # stop signal
-            break
+    def _on_word(self, name, location, length):
+        if self._interrupted and self._interrupted():
+            self.engine.stop()
+
+    def speak(self, text, started, interrupted):
+        self._started, self._interrupted = started, interrupted
         try:
-            if TTS:
-                TTS.say(text)
-                TTS.runAndWait()
-        except Exception as e:
-            print("[TTS error]", e)
+            self.engine.say(text)
+            self.engine.runAndWait()
         finally:
-            TTS_QUEUE.task_done()
+            self._started = self._interrupted = None
+
+    def synth_to_file(self, text, path):
+        self.engine.save_to_file(text, path)
+        self.engine.runAndWait()
+        return os.path.exists(path) and os.path.getsize(path) > 44
+
+    def play_file(self, path, started, interrupted):
+        if not sys.platform.startswith("win"):
+            return False
+        import winsound, wave
+        with wave.open(path) as w:
+            secs = w.getnframes() / w.getframerate()
+        winsound.PlaySound(path, winsound.SND_FILENAME | winsound.SND_ASYNC | winsound.SND_NODEFAULT)
+        started()
+        end = time.perf_counter() + secs
+        while time.perf_counter() < end:
+            if interrupted():
+                winsound.PlaySound(None, 0); break
+            time.sleep(0.02)
+        return True
+
+class StubSpeech:
+    """Silent stand-in backend for tests and benchmarks: audio "starts" after
+    startup_ms (at once for cached files) and "plays" for ms_per_char per
+    character, checking for interruption every few ms."""
+    def __init__(self, startup_ms=150.0, ms_per_char=40.0):
+        self.startup_ms, self.ms_per_char = startup_ms, ms_per_char
+        self.voice = f"stub:{ms_per_char}"
+        self.spoken = []  # (text, played to the end)
+
+    def _play(self, text, delay_ms, started, interrupted):
+        t0 = time.perf_counter()
+        for wait_ms, on_done in ((delay_ms, started), (len(text) * self.ms_per_char, None)):
+            end = time.perf_counter() + wait_ms / 1000
+            while time.perf_counter() < end:
+                if interrupted():
+                    self.spoken.append((text, False)); return
+                time.sleep(0.005)
+            if on_done: on_done()
+        self.spoken.append((text, True))
+
+    def speak(self, text, started, interrupted):
+        self._play(text, self.startup_ms, started, interrupted)
+
+    def synth_to_file(self, text, path):
+        time.sleep(self.startup_ms / 1000)
+        with open(path, "w", encoding="utf-8") as f: f.write(text)
+        return True
+
+    def play_file(self, path, started, interrupted):
+        with open(path, "r", encoding="utf-8") as f: text = f.read()
+        self._play(text, 0, started, interrupted)
+        return True
+
+SPEECH_BACKENDS = {"pyttsx3": Pyttsx3Speech, "stub": StubSpeech}
+
+class Speech:
+    def __init__(self):
+        self.gen = 0
+        self.queue = queue.Queue()
+        self.backend = False if TTS_BACKEND == "off" else None  # set by run(); False if unavailable
+        self.phrases = {}    # fixed phrase -> synthesized file
+        self.counts = {"spoken": 0, "interrupted": 0, "dropped": 0, "coalesced": 0, "cached": 0}
+
+    def interrupt(self):
+        """A new command started: stop speaking and make queued replies stale."""
+        self.gen += 1
+        return self.gen
+
+    def say(self, text, gen=None):
+        if self.backend is not False:  # queued until the engine is up
+            self.queue.put((self.gen if gen is None else gen, text, time.perf_counter()))
+
+    def stats(self):
+        return {**self.counts, "backend": getattr(self.backend, "voice", None),
+                "phrases_cached": len(self.phrases), "pending": self.queue.qsize()}
+
+    def run(self, backend=None):
+        # the engine is created on its own thread: pyttsx3.init() can take
+        # seconds (SAPI) and must run on the thread that drives it anyway
+        try:
+            self.backend = backend or SPEECH_BACKENDS[TTS_BACKEND]()
+        except Exception as e:
+            self.backend = False
+            print("[TTS] Not available:", e)
+            return
+        startup_mark("tts")
+        todo = self._load_phrases()
+        while True:
+            try:
+                item = self.queue.get(timeout=0.2 if todo else None)
+            except queue.Empty:
+                self._synth_phrase(todo.pop())  # idle: pre-synthesize one more
+                continue
+            if item is None:  # stop signal
+                break
+            batch = self._collect(item)
+            if batch:
+                try:
+                    self._speak(*batch)
+                except Exception as e:
+                    print("[TTS error]", e)
+
+    def _collect(self, item):
+        """item plus everything else pending, minus stale entries, as one utterance."""
+        items = [item]
+        while True:
+            try: nxt = self.queue.get_nowait()
+            except queue.Empty: break
+            if nxt is None: self.queue.put(None); break
+            items.append(nxt)
+        now = time.perf_counter()
+        live = [it for it in items if it[0] == self.gen and now - it[2] <= TTS_MAX_AGE_S]
+        self.counts["dropped"] += len(items) - len(live)
+        if not live:
+            return None
+        self.counts["coalesced"] += len(live) - 1
+        return live[0][0], " ".join(it[1] for it in live), live[0][2]
+
+    def _speak(self, gen, text, queued_at):
+        interrupted = lambda: self.gen != gen
+        first = []
+        def started():
+            if not first:
+                first.append(1)
+                TRACER.record("tts_first_audio", (time.perf_counter() - queued_at) * 1000)
+        prefix = max((p for p in self.phrases if text.startswith(p)), key=len, default=None)
+        if prefix and self.backend.play_file(self.phrases[prefix], started, interrupted):
+            self.counts["cached"] += 1
+            text = text[len(prefix):].strip()
+        if text and not interrupted():
+            self.backend.speak(text, started, interrupted)
+        self.counts["interrupted" if interrupted() else "spoken"] += 1
+
+    def _phrase_path(self, text):
+        key = hashlib.sha1(f"{self.backend.voice}|{text}".encode("utf-8")).hexdigest()[:16]
+        return os.path.join(CACHE_DIR, "tts", key + ".wav")
+
+    def _load_phrases(self):
+        todo = []
+        for p in TTS_PHRASES:
+            path = self._phrase_path(p)
+            if os.path.exists(path): self.phrases[p] = path
+            else: todo.append(p)
+        return todo
 
-if TTS:
-    threading.Thread(target=tts_worker, daemon=True).start()
+    def _synth_phrase(self, text):
+        path = self._phrase_path(text)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            if self.backend.synth_to_file(text, path + ".tmp.wav"):
+                os.replace(path + ".tmp.wav", path)
+                self.phrases[text] = path
+        except Exception as e:
+            print("[TTS] Could not cache phrase:", e)
+
+SPEECH = Speech()
 
 # ──────────────────────────────────────────────────────────────────
 # UI setup
 # ──────────────────────────────────────────────────────────────────
 import tkinter as tk
-UI_EVENTS = queue.Queue(maxsize=200)
+UI_EVENTS = queue.Queue(maxsize=1000)
+UI_DROPPED = {"n":0}  # lines that didn't fit in UI_EVENTS, shown by the next drain
+UI_SCROLLBACK = int(os.getenv("JARVIS_SCROLLBACK", "2000"))
 
-def ui_log(line: str):
+def ui_log(line: str, event=None):
+    """Show a line in the window; also publish it (or `event`) to the web UI."""
     try: UI_EVENTS.put_nowait(line)
-    except queue.Full: pass
+    except queue.Full: UI_DROPPED["n"] += 1
+    PUBLISHER.publish(event or {"type":"info","text":line})
+
+# Web UI feed: events are batched to ui_server's POST /events over one
+# keep-alive connection instead of one request per line. When the server
+# isn't running, batches are dropped (and counted) with a short back-off.
+UI_SERVER_URL = os.getenv("JARVIS_UI_URL", "http://127.0.0.1:8787")
+PUBLISH_BATCH = 200
+PUBLISH_FLUSH_S = 0.1
+PUBLISH_RETRY_S = 5.0
+PUBLISH_REPORT_S = 60.0
+
+class UIPublisher:
+    def __init__(self, url, max_batch=PUBLISH_BATCH, flush_s=PUBLISH_FLUSH_S, maxsize=2000):
+        u = urllib.parse.urlsplit(url)
+        self.host, self.port = u.hostname or "127.0.0.1", u.port or 80
+        self.path = (u.path.rstrip("/") or "") + "/events"
+        self.max_batch, self.flush_s = max_batch, flush_s
+        self.q = queue.Queue(maxsize)
+        self.conn = None
+        self.down_until = 0.0
+        self.sent = self.batches = self.dropped = self.failures = self.max_size = 0
+        self.running = False
+
+    def publish(self, event):
+        try: self.q.put_nowait(event)
+        except queue.Full: self.dropped += 1
+
+    def start(self):
+        self.running = True
+        threading.Thread(target=self._run, daemon=True).start()
+        return self
+
+    def stats(self):
+        return {"sent": self.sent, "batches": self.batches, "dropped": self.dropped,
+                "failures": self.failures, "max_batch": self.max_size,
+                "avg_batch": round(self.sent / self.batches, 1) if self.batches else 0.0,
+                "pending": self.q.qsize()}
+
+    def _next_batch(self):
+        batch = [self.q.get()]
+        deadline = time.monotonic() + self.flush_s
+        while len(batch) < self.max_batch:
+            left = deadline - time.monotonic()
+            if left <= 0: break
+            try: batch.append(self.q.get(timeout=left))
+            except queue.Empty: break
+        return batch
+
+    def _send(self, batch):
+        body = json.dumps(batch).encode("utf-8")
+        for attempt in (1, 2):  # one retry on a stale keep-alive connection
+            if self.conn is None:
+                self.conn = http.client.HTTPConnection(self.host, self.port, timeout=2)
+            try:
+                self.conn.request("POST", self.path, body, {"Content-Type": "application/json"})
+                self.conn.getresponse().read()
+                return True
+            except (OSError, http.client.HTTPException):
+                self.conn.close(); self.conn = None
+        return False
+
+    def _run(self):
+        last_report, reported = time.monotonic(), None
+        while self.running:
+            batch = self._next_batch()
+            if time.monotonic() < self.down_until or not self._send(batch):
+                if time.monotonic() >= self.down_until: self.failures += 1
+                self.down_until = max(self.down_until, time.monotonic() + PUBLISH_RETRY_S)
+                self.dropped += len(batch)
+            else:
+                self.sent += len(batch); self.batches += 1
+                self.max_size = max(self.max_size, len(batch))
+            if time.monotonic() - last_report >= PUBLISH_REPORT_S:
+                last_report, st = time.monotonic(), self.stats()
+                if st != reported:
+                    reported = st
+                    print(f"[UI pub] sent {st['sent']} in {st['batches']} batches "
+                          f"(avg {st['avg_batch']}, max {st['max_batch']}), dropped {st['dropped']}")
+
+PUBLISHER = UIPublisher(UI_SERVER_URL)
 
 class JarvisUI:
     def __init__(self):
@@ -78,14 +342,26 @@ class JarvisUI:
         color = "#4da3ff" if on else "#444"
         self.dot.create_oval(2, 2, 10, 10, fill=color, outline=color)
 
-    def set_listening(self, on): self.root.after(0, lambda: self._set_listening(on))
+    def set_listening(self, on):
+        PUBLISHER.publish({"type":"status","value":"listening_on" if on else "listening_off"})
+        self.root.after(0, lambda: self._set_listening(on))
 
     def _drain_queue(self):
+        # one insert per tick for everything pending; scrollback is trimmed in
+        # bulk once it overshoots UI_SCROLLBACK by 10%
+        lines = []
         while True:
-            try: line = UI_EVENTS.get_nowait()
+            try: lines.append(UI_EVENTS.get_nowait())
             except queue.Empty: break
+        dropped, UI_DROPPED["n"] = UI_DROPPED["n"], 0
+        if dropped: lines.append(f"[… {dropped} lines dropped]")
+        if lines:
+            lines = lines[-UI_SCROLLBACK:]
             self.text.configure(state="normal")
-            self.text.insert("end", line + "\n")
+            self.text.insert("end", "\n".join(lines) + "\n")
+            count = int(self.text.index("end-1c").split(".")[0]) - 1
+            if count > UI_SCROLLBACK * 1.1:
+                self.text.delete("1.0", f"{count - UI_SCROLLBACK + 1}.0")
             self.text.see("end")
             self.text.configure(state="disabled")
         self.root.after(60, self._drain_queue)
@@ -99,12 +375,53 @@ load_dotenv(override=True)
 API_KEY = os.getenv("OPENAI_API_KEY") or ""
 if not API_KEY:
     print("[!] No OPENAI_API_KEY in .env")
-client = OpenAI(api_key=API_KEY)
+client = None
+_CLIENT_LOCK = threading.Lock()
+# Connections are pooled and kept alive well past httpx's 5 s default, so the
+# handshake is paid once; prewarm_api() refreshes them on hotkey press.
+HTTP_POOL_SIZE = 8
+HTTP_KEEPALIVE_S = float(os.getenv("JARVIS_HTTP_KEEPALIVE", "30"))
+
+def http_client():
+    """Pooled keep-alive transport for an OpenAI client."""
+    import httpx
+    from openai import DefaultHttpxClient
+    return DefaultHttpxClient(limits=httpx.Limits(max_connections=HTTP_POOL_SIZE,
+                                                  max_keepalive_connections=HTTP_POOL_SIZE,
+                                                  keepalive_expiry=HTTP_KEEPALIVE_S))
+
+def get_client():
+    """The OpenAI client, created (and the openai package imported) on first use."""
+    global client
+    if client is None:
+        with _CLIENT_LOCK:
+            if client is None:
+                from openai import OpenAI
+                client = OpenAI(api_key=API_KEY, http_client=http_client())
+    return client
+
+def warm_client():
+    try:
+        get_client()
+        startup_mark("api_client")
+    except Exception as e:
+        ui_log(f"[!] OpenAI client: {e}")
 
 # ──────────────────────────────────────────────────────────────────
 # Actions
 # ──────────────────────────────────────────────────────────────────
-action.get("path")
+def load_actions():
+    try:
+        with open("actions.yaml", "r", encoding="utf-8") as f:
+            return (yaml.safe_load(f) or {}).get("intents") or {}
+    except Exception as e:
+        print("[!] Could not load actions.yaml:", e)
+        return {}
+ACTIONS = load_actions()
+
+def run_action(intent_name):
+    action = ACTIONS.get(intent_name) or {}
+    typ, path = action.get("type"), action.get("path")
     try:
         if typ == "exec": subprocess.Popen(path if isinstance(path,str) else [path], shell=True)
         elif typ == "open":
@@ -158,96 +475,306 @@ APP_ALIASES = {
     "enscape": ["enscape.exe"],
 }
 
+# Persistent index: the last snapshot is loaded at startup and refreshed in the
+# background, re-reading only directories whose mtime changed since last time.
+CACHE_DIR = os.getenv("JARVIS_CACHE_DIR") or os.path.join(
+    os.environ.get("LOCALAPPDATA") or os.path.expanduser("~"), "JarvisPC")
+APP_INDEX_CACHE = os.path.join(CACHE_DIR, "app_index.json")
+APP_INDEX_VERSION = 1
+APP_EXTS = (".lnk", ".exe")
+APP_DIR_CACHE = {}  # dir -> {"mtime": float, "files": [names], "dirs": [names]}
+
+# Crawler: one os.scandir task per directory on a thread pool, fanned out across
+# all roots at once. Each root gets a time budget; when it runs out the root is
+# marked partial and whatever isn't crawled yet is filled in from the listing
+# cache (if any) instead of stalling everything behind it.
+CRAWL_WORKERS = int(os.getenv("JARVIS_CRAWL_WORKERS", "8"))
+CRAWL_BUDGET_S = float(os.getenv("JARVIS_CRAWL_BUDGET", "15"))
+# Folders skipped when indexing apps. User folders (FileIndex, live searches)
+# are crawled in full unless JARVIS_SEARCH_EXCLUDE names folders to skip.
+CRAWL_EXCLUDE = frozenset({
+    "node_modules", "__pycache__", ".git", ".svn", ".venv", "venv", ".cache",
+    "cache", "caches", "temp", "tmp", "$recycle.bin", "system volume information",
+})
+SEARCH_EXCLUDE = frozenset(n.strip().lower() for n in
+                           os.getenv("JARVIS_SEARCH_EXCLUDE", "").split(",") if n.strip())
+def _index_roots():
+    return {"start": SEARCH_DIRS, "programs": PROGRAM_DIRS, "exclude": sorted(CRAWL_EXCLUDE)}
+
+def _list_dir(d, old, listed, exclude):
+    """Listing for one directory, reusing the cached one if its mtime is unchanged."""
+    try: mtime = os.stat(d).st_mtime
+    except OSError: return None, False
+    entry = old.get(d)
+    if entry and entry.get("mtime") == mtime:
+        return entry, False
+    files, dirs = [], []
+    try:
+        with os.scandir(d) as it:
+            for e in it:
+                try:
+                    if e.is_dir(follow_symlinks=False):
+                        if e.name.lower() not in exclude: dirs.append(e.name)
+                    elif listed is None or e.name.lower().endswith(listed):
+                        files.append(e.name)
+                except OSError: pass
+    except OSError:
+        return None, False
+    return {"mtime": mtime, "files": files, "dirs": dirs}, True
+
+def _keep(name, exts, match):
+    n = name.lower()
+    return (exts is None or n.endswith(exts)) and (match is None or match(n))
+
+def _from_cache(d, old, new, out, exts, match):
+    """Fill in a subtree the crawl ran out of time for from cached listings only."""
+    stack = [d]
+    while stack:
+        d = stack.pop()
+        entry = old.get(d)
+        if not entry: continue
+        new[d] = entry
+        out.extend(os.path.join(d, f) for f in entry["files"] if _keep(f, exts, match))
+        stack.extend(os.path.join(d, s) for s in entry["dirs"])
+
+def crawl(roots, exts=None, match=None, listed=None, old=None, new=None,
+          exclude=frozenset(), budget=CRAWL_BUDGET_S, workers=CRAWL_WORKERS):
+    """Crawl roots in parallel. Returns ({root: [paths]}, {root: stats}).
+
+    exts/match filter the returned files (match gets the lowercase name),
+    listed filters what is kept in the directory listings stored in `new`;
+    `old` holds listings from a previous crawl to reuse for unchanged dirs.
+    """
+    old = old or {}
+    new = {} if new is None else new
+    out = {r: [] for r in roots}
+    stats = {r: {"files": 0, "dirs": 0, "reread": 0, "secs": 0.0, "partial": False}
+             for r in roots}
+    start = time.perf_counter()
+    deadline = {r: start + budget for r in roots}
+    todo = {r: deque([r] if os.path.isdir(r) else []) for r in roots}
+    inflight = Counter()
+    pending = {}
+    pool = ThreadPoolExecutor(max_workers=workers)
+    def pump():
+        # round-robin across roots, capping each root's share of the pool so a
+        # slow volume can't occupy every worker while fast roots wait
+        active = [r for r in todo if todo[r] or inflight[r]]
+        cap = max(1, workers // max(1, len(active)))
+        while len(pending) < workers:
+            ready = [r for r in active if todo[r] and inflight[r] < cap]
+            if not ready: break
+            for r in ready:
+                if len(pending) >= workers: break
+                d = todo[r].popleft()
+                pending[pool.submit(_list_dir, d, old, listed, exclude)] = (r, d)
+                inflight[r] += 1
+    def expire(root):
+        stats[root]["partial"] = True
+        stats[root]["secs"] = budget
+        while todo[root]:
+            _from_cache(todo[root].popleft(), old, new, out[root], exts, match)
+    try:
+        pump()
+        while pending:
+            timeout = max(0.0, min(deadline[r] for r, _ in pending.values()) - time.perf_counter())
+            done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            now = time.perf_counter()
+            for f in done:
+                root, d = pending.pop(f)
+                inflight[root] -= 1
+                entry, reread = f.result()
+                st = stats[root]
+                st["secs"] = now - start
+                if entry is None: continue
+                new[d] = entry
+                st["dirs"] += 1; st["reread"] += reread
+                for name in entry["files"]:
+                    if _keep(name, exts, match): out[root].append(os.path.join(d, name))
+                todo[root].extend(os.path.join(d, s) for s in entry["dirs"])
+            for root in todo:
+                if now >= deadline[root] and (todo[root] or inflight[root]):
+                    for f, (r, d) in list(pending.items()):  # abandon slow dirs
+                        if r == root:
+                            del pending[f]; f.cancel(); inflight[r] -= 1
+                            todo[root].append(d)
+                    expire(root)
+            pump()
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+    for r in roots:
+        stats[r]["files"] = len(out[r])
+    return out, stats
+
+def crawl_report(tag, stats):
+    """Print per-root crawl timing, slowest first, so bottleneck roots stand out."""
+    for r, st in sorted(stats.items(), key=lambda kv: -kv[1]["secs"]):
+        if not st["dirs"]: continue
+        print(f"[{tag}] {r}: {st['files']} files, {st['dirs']} dirs "
+              f"({st['reread']} re-read), {st['secs']:.2f}s" + (" PARTIAL" if st["partial"] else ""))
+
+def _write_json_atomic(path, data, tag):
+    """Write data as JSON via a temp file + rename, so readers never see half a file."""
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp, path)
+    except OSError as e:
+        print(f"[{tag}] Could not save {os.path.basename(path)}:", e)
+
+def load_app_index_cache():
+    """Serve the last saved snapshot right away. Returns True if one was loaded."""
+    global APP_DIR_CACHE, INDEX_READY
+    try:
+        with open(APP_INDEX_CACHE, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return False
+    if not isinstance(data, dict) or data.get("version") != APP_INDEX_VERSION \
+            or data.get("roots") != _index_roots():
+        return False
+    apps, dirs = data.get("apps") or [], data.get("dirs") or {}
+    # a damaged snapshot is ignored; build_app_index then rescans from scratch
+    if not (isinstance(apps, list) and all(isinstance(p, str) for p in apps)
+            and isinstance(dirs, dict)
+            and all(isinstance(e, dict) and isinstance(e.get("files"), list)
+                    and isinstance(e.get("dirs"), list) for e in dirs.values())):
+        return False
+    APP_DIR_CACHE = dirs
+    _set_app_index(apps)
+    INDEX_READY = bool(APP_INDEX)
+    return INDEX_READY
+
+def save_app_index_cache():
+    data = {"version": APP_INDEX_VERSION, "roots": _index_roots(),
+            "apps": APP_INDEX, "dirs": APP_DIR_CACHE}
+    _write_json_atomic(APP_INDEX_CACHE, data, "Index")
+
 def build_app_index():
     """Scan Start Menu + Program Files for apps"""
-    global APP_INDEX, INDEX_READY
-    paths = []
-    # Scan Start Menu
-    for d in SEARCH_DIRS:
-        if os.path.isdir(d):
-            for root, _, files in os.walk(d):
-                for f in files:
-                    if f.lower().endswith((".lnk", ".exe")):
-                        paths.append(os.path.join(root, f))
-    # Scan Program Files
-    for d in PROGRAM_DIRS:
-        if os.path.isdir(d):
-            for root, _, files in os.walk(d):
-                for f in files:
-                    if f.lower().endswith(".exe"):
-                        paths.append(os.path.join(root, f))
-    # Remove duplicates
-    APP_INDEX = list(set(paths))
+    global APP_DIR_CACHE, INDEX_READY
+    t0 = time.perf_counter()
+    new = {}
+    # Start Menu keeps shortcuts + exes, Program Files only exes
+    found, stats = crawl(SEARCH_DIRS + PROGRAM_DIRS, exts=APP_EXTS, listed=APP_EXTS,
+                         old=APP_DIR_CACHE, new=new, exclude=CRAWL_EXCLUDE)
+    paths = [p for d in SEARCH_DIRS for p in found[d]]
+    paths += [p for d in PROGRAM_DIRS for p in found[d] if p.lower().endswith(".exe")]
+    # Remove duplicates; swap in one assignment so lookups keep using the old snapshot until now
+    _set_app_index(list(dict.fromkeys(paths)))
+    APP_DIR_CACHE = new
     INDEX_READY = True
-    print(f"[Index] Found {len(APP_INDEX)} apps.")
+    save_app_index_cache()
+    reread = sum(st["reread"] for st in stats.values())
+    print(f"[Index] Found {len(APP_INDEX)} apps "
+          f"({reread}/{len(new)} dirs re-read, {time.perf_counter()-t0:.1f}s).")
+    crawl_report("Index", stats)
+
+def _app_name(path):
+    """Normalized match key for an app path: lowercase basename minus .exe/.lnk."""
+    n = os.path.basename(path).lower()
+    return n[:-4] if n.endswith(APP_EXTS) else n
+
+def _trigrams(s):
+    s = f" {s} "
+    return {s[i:i+3] for i in range(len(s) - 2)}
+
+class AppMatcher:
+    """Prebuilt fuzzy-match structure over APP_INDEX (rebuilt only when it changes).
+
+    A trigram prefilter trims the index to a bounded shortlist so a lookup
+    stays flat as the index grows: it counts each term's rarest trigrams and
+    skips the very common ones. All alias terms are then scored in one
+    batched cdist pass.
+    """
+    MAX_CANDIDATES = 2000
+
+    def __init__(self, paths):
+        self.by_name = {}
+        for p in paths:
+            self.by_name.setdefault(_app_name(p), p)
+        self.names = list(self.by_name)
+        self.grams = {}
+        for i, n in enumerate(self.names):
+            for g in _trigrams(n):
+                self.grams.setdefault(g, []).append(i)
+        self.aliases = {k: list(dict.fromkeys([k] + [_app_name(a) for a in v]))
+                        for k, v in APP_ALIASES.items()}
+
+    def terms(self, q):
+        return self.aliases.get(q) or [q]
+
+    def _shortlist(self, terms):
+        # rarest trigrams first, and at most ~MAX_CANDIDATES postings per term:
+        # once the rare ones have turned up candidates, trigrams shared by
+        # thousands of names would only cost time
+        counts = Counter()
+        for t in terms:
+            posts = sorted((self.grams[g] for g in _trigrams(t) if g in self.grams), key=len)
+            seen = 0
+            for post in posts:
+                if seen and seen + len(post) > self.MAX_CANDIDATES:
+                    break
+                counts.update(post[:self.MAX_CANDIDATES])
+                seen += len(post)
+        return sorted(counts, key=counts.__getitem__, reverse=True)[:self.MAX_CANDIDATES]
+
+    def best(self, q, cutoff=70):
+        terms = self.terms(q)
+        for t in terms:  # exact hit, no scoring needed
+            if t in self.by_name:
+                return self.by_name[t]
+        idx = self._shortlist(terms)
+        if not idx:
+            return None
+        from rapidfuzz import process, fuzz
+        choices = [self.names[i] for i in idx]
+        scores = process.cdist(terms, choices, scorer=fuzz.WRatio, score_cutoff=cutoff).max(axis=0)
+        top = scores.max()
+        if top < cutoff:
+            return None
+        # equally good names: prefer the one launched most (and most recently)
+        tied = [self.by_name[choices[c]] for c in (scores >= top).nonzero()[0]]
+        return max(tied, key=HOT_TARGETS.path_score) if len(tied) > 1 else tied[0]
+
+APP_MATCHER = None
+
+def _set_app_index(paths):
+    """Swap in a new index snapshot, rebuilding the matcher only if it changed."""
+    global APP_INDEX, APP_MATCHER
+    if APP_MATCHER is None or paths != APP_INDEX:
+        APP_MATCHER = AppMatcher(paths)
+    APP_INDEX = paths
 
 def find_best_app(name):
     """Fuzzy match an app name to our index, with alias help."""
-    if not INDEX_READY or not APP_INDEX:
+    matcher = APP_MATCHER
+    if not INDEX_READY or matcher is None or not matcher.names:
         return None
-    names = [os.path.basename(p) for p in APP_INDEX]
     q = (name or "").strip().lower()
-    # try the raw query + any aliases
-    candidates = [q] + APP_ALIASES.get(q, [])
-    best_score = -1
-    best_idx = -1
-    for term in candidates:
-        res = process.extractOne(term, names, scorer=fuzz.WRatio, score_cutoff=70)
-        if res:
-            _, score, idx = res
-            if score > best_score:
-                best_score = score
-                best_idx = idx
-    if best_idx == -1:
-        return None
-    return APP_INDEX[best_idx]
+    return matcher.best(q) if q else None
 
 
-def open_app_by_name(name: str) -> bool:
+def launch_app(p):
+    if p.lower().endswith(".exe"):
+        subprocess.Popen([p], shell=True)
+    else:
+        # .lnk/.url — let Explorer handle
+        if sys.platform.startswith("win"):
+            subprocess.Popen(["explorer", p])
+        else:
+            subprocess.Popen([p], shell=True)
+
+def open_app_by_name(name: str, hints=None) -> bool:
     """Try to open app by fuzzy name from our index, or fallback to shell."""
-    p = find_best_app(name)
+    with span("find_best_app"): p = find_best_app(name)
     if p:
         try:
-            if p.lower().endswith(".exe"):
-                subprocess.Popen([p], shell=True)
-            else:
-                # .lnk/.url — let Explorer handle
-                if sys.platform.startswith("win"):
-                    subprocess.Popen(["explorer", p])
-                else:
-                    subprocess.Popen([p], shell=True)
-            ui_log(f"[✓] Launched via index: {p}")
-            return True
-        except Exception as e:
-            ui_log(f"[open_app_by_name error] {e}")
-
-    # Try PATH (rare for big GUIs, good for CLI tools)
-    exe = shutil.which(name)
-    if exe:
-        try:
-            subprocess.Popen([exe], shell=True)
-            ui_log(f"[✓] Launched via PATH: {exe}")
-            return True
-        except Exception as e:
-            ui_log(f"[open_app_by_name PATH error] {e}")
-
-    # Last resort: shell start (sometimes opens registered apps)
-    try:
-        subprocess.Popen(['cmd', '/c', 'start', '', name], shell=True)
-        ui_log(f"[~] Attempted shell start: {name}")
-        return True
-    except Exception as e:
-        ui_log(f"[open_app_by_name shell error] {e}")
-    return False
-er().endswith(".exe"):
-                subprocess.Popen([p], shell=True)
-            else:
-                # .lnk/.url — let Explorer handle
-                if sys.platform.startswith("win"):
-                    subprocess.Popen(["explorer", p])
-                else:
-                    subprocess.Popen([p], shell=True)
+            launch_app(p)
             ui_log(f"[✓] Launched via index: {p}")
+            HOT_TARGETS.record(name, hints, "app", p)
             return True
         except Exception as e:
             ui_log(f"[open_app_by_name error] {e}")
@@ -258,6 +785,7 @@ er().endswith(".exe"):
         try:
             subprocess.Popen([exe], shell=True)
             ui_log(f"[✓] Launched via PATH: {exe}")
+            HOT_TARGETS.record(name, hints, "exe", exe)
             return True
         except Exception as e:
             ui_log(f"[open_app_by_name PATH error] {e}")
@@ -284,24 +812,103 @@ def _patterns(target, hints):
     for p in pats:
         if p not in seen: seen.add(p); out.append(p)
     return out
-def _search(dirpath, patterns):
-    hits=[]
-    if not os.path.isdir(dirpath): return hits
-    for root,_,files in os.walk(dirpath):
-        for f in files:
-            if any(fnmatch.fnmatch(f.lower(), p.lower()) for p in patterns):
-                hits.append(os.path.join(root, f)); break
-    return hits
+SEARCH_BUDGET_S = float(os.getenv("JARVIS_SEARCH_BUDGET", "3"))
+
+def _search(dirpath, patterns, old=None):
+    pats=[p.lower() for p in patterns]
+    found,_=crawl([dirpath], match=lambda n: any(fnmatch.fnmatch(n, p) for p in pats),
+                  old=old, exclude=SEARCH_EXCLUDE, budget=SEARCH_BUDGET_S)
+    return found[dirpath]
+
+def _needles(patterns):
+    """Substrings equivalent to the `*x*` patterns (the `*x*.ext` ones are implied)."""
+    return [p[1:-1].lower() for p in patterns if len(p) > 1 and p[0] == p[-1] == "*"]
+
+class FileIndex:
+    """Resident filename index over SEARCH_DIRS with a trigram substring lookup.
+
+    Kept current by a periodic mtime sweep (see file_index_worker); only
+    directories whose mtime changed are re-listed, and the lookup tables are
+    rebuilt only when something actually changed.
+    """
+    def __init__(self, roots):
+        self.roots = list(roots)
+        self.dirs = {}
+        self.by_root = {}  # root -> (paths, lowercase names, trigram -> [idx])
+        self.stats = {}
+
+    def refresh(self):
+        new, by_root, reread = {}, {}, 0
+        found, self.stats = crawl(self.roots, old=self.dirs, new=new, exclude=SEARCH_EXCLUDE)
+        for r in self.roots:
+            paths, changed = found[r], self.stats[r]["reread"]
+            reread += changed
+            old = self.by_root.get(r)
+            if old and not changed and len(old[0]) == len(paths):
+                by_root[r] = old
+                continue
+            names = [os.path.basename(p).lower() for p in paths]
+            grams = {}
+            for i, n in enumerate(names):
+                for g in {n[j:j+3] for j in range(len(n) - 2)}:
+                    grams.setdefault(g, []).append(i)
+            by_root[r] = (paths, names, grams)
+        self.dirs, self.by_root = new, by_root
+        return reread
+
+    def search(self, root, needles):
+        """Paths under root whose name contains any needle; None if root isn't indexed."""
+        entry = self.by_root.get(root)
+        if entry is None: return None
+        paths, names, grams = entry
+        hits = set()
+        for n in needles:
+            if len(n) < 3:
+                idx = range(len(names))
+            else:
+                posts = sorted((grams.get(n[j:j+3], ()) for j in range(len(n) - 2)), key=len)
+                idx = set(posts[0]).intersection(*posts[1:]) if posts[0] else ()
+            hits.update(i for i in idx if n in names[i])
+        return [paths[i] for i in hits]
+
+FILE_INDEX = FileIndex(SEARCH_DIRS)
+FILE_INDEX_SWEEP_S = float(os.getenv("JARVIS_FILE_INDEX_SWEEP", "30"))
+FILE_INDEX_KICK = threading.Event()  # set on a lookup miss: sweep now, not at the next tick
+
+def file_index_worker():
+    first = True
+    while True:
+        t0 = time.perf_counter()
+        try:
+            reread = FILE_INDEX.refresh()
+            if first: startup_mark("file_index"); first = False
+            if reread:
+                n = sum(len(e[0]) for e in FILE_INDEX.by_root.values())
+                print(f"[Files] Indexed {n} files ({reread} dirs re-read, {time.perf_counter()-t0:.1f}s).")
+                crawl_report("Files", FILE_INDEX.stats)
+        except Exception as e:
+            print("[Files] Index refresh failed:", e)
+        FILE_INDEX_KICK.wait(FILE_INDEX_SWEEP_S); FILE_INDEX_KICK.clear()
+
 def resolve_target(target,hints=None):
     t=target.strip().strip('"')
     if os.path.isabs(t) or t.startswith("~"):
         path=os.path.expanduser(t)
         if os.path.exists(path): return ("path", path)
+    pats=_patterns(target,hints); needles=_needles(pats)
+    missed=False
     for d in SEARCH_DIRS:
-        hits=_search(d, _patterns(target,hints))
+        hits=FILE_INDEX.search(d, needles)
+        if hits is None: hits=_search(d, pats, FILE_INDEX.dirs)  # not indexed yet
+        else:
+            # the index is up to one sweep old: skip files deleted since
+            hits=[h for h in hits if os.path.exists(h)]
+            missed=missed or not hits
         if hits:
-            hits.sort(key=lambda x: (not x.lower().endswith((".lnk",".exe")), len(x)))
+            hits.sort(key=lambda x: (not x.lower().endswith((".lnk",".exe")), len(x),
+                                     -HOT_TARGETS.path_score(x)))
             return ("file", hits[0])
+    if missed: FILE_INDEX_KICK.set()  # in case it was created since the last sweep
     exe=shutil.which(target)
     if exe: return ("exe", exe)
     return (None,None)
@@ -312,15 +919,356 @@ def run_open_resolved(kind, path):
             elif sys.platform == "darwin": subprocess.Popen(["open", path])
             else: subprocess.Popen(["xdg-open", path])
         elif kind=="exe": subprocess.Popen([path], shell=True)
+        elif kind=="app": launch_app(path)
         else: return say("Weird, I don't know how to open that.")
         ui_log(f"[✓] Opened: {path}")
+        return True
     except Exception as e: say(f"Opening failed: {e}")
 
+# Hot targets: what each spoken target (+ hints) resolved to last time it was
+# opened successfully, with a frecency score (launch count decayed by age).
+# Repeat commands skip the index scans and fuzzy matching entirely; entries
+# whose path is gone are dropped on lookup. Scores also break ties when
+# ranking search hits and fuzzy app matches.
+HOT_TARGETS_PATH = os.path.join(CACHE_DIR, "hot_targets.json")
+HOT_TARGETS_SIZE = int(os.getenv("JARVIS_HOT_TARGETS", "500"))
+HOT_HALF_LIFE_S = 14 * 24 * 3600
+
+class HotTargets:
+    def __init__(self, path, size):
+        self.path, self.size = path, size
+        self.items = {}    # key -> {"kind", "path", "score", "last"}
+        self.by_path = {}  # path -> score summed over keys (as of the last change)
+        self.lock = threading.Lock()
+        self.hits = self.misses = self.dropped = 0
+        self._load()
+
+    @staticmethod
+    def key(target, hints=None):
+        h = " ".join(sorted(_phrase(x) for x in hints or () if isinstance(x, str)))
+        return f"{_phrase(target)}|{h}"
+
+    @staticmethod
+    def _decayed(score, last, now):
+        return score * 0.5 ** (max(0.0, now - last) / HOT_HALF_LIFE_S)
+
+    def get(self, target, hints=None):
+        """(kind, path) last opened for this target, if the path still exists."""
+        k = self.key(target, hints)
+        with self.lock:
+            item = self.items.get(k)
+        if item and not os.path.exists(item["path"]):
+            with self.lock:
+                self.items.pop(k, None); self._reindex()
+                self.dropped += 1
+            self._save()
+            item = None
+        with self.lock:
+            if not item:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return item["kind"], item["path"]
+
+    def record(self, target, hints, kind, path):
+        now = time.time()
+        with self.lock:
+            item = self.items.get(self.key(target, hints))
+            score = self._decayed(item["score"], item["last"], now) if item and item["path"] == path else 0.0
+            self.items[self.key(target, hints)] = {"kind": kind, "path": path,
+                                                   "score": score + 1, "last": now}
+            if len(self.items) > self.size:
+                k = min(self.items, key=lambda k: self._decayed(self.items[k]["score"],
+                                                                 self.items[k]["last"], now))
+                del self.items[k]
+            self._reindex()
+        self._save()
+
+    def path_score(self, path):
+        # decaying every score by the same age doesn't change their order
+        return self.by_path.get(path, 0.0)
+
+    def stats(self):
+        return {"size": len(self.items), "hits": self.hits, "misses": self.misses,
+                "dropped": self.dropped}
+
+    def _reindex(self):
+        now, by_path = time.time(), {}
+        for it in self.items.values():
+            by_path[it["path"]] = by_path.get(it["path"], 0.0) + self._decayed(it["score"], it["last"], now)
+        self.by_path = by_path
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                items = json.load(f)
+        except (OSError, ValueError):
+            return
+        for k, it in items.items() if isinstance(items, dict) else ():
+            try:
+                self.items[str(k)] = {"kind": str(it["kind"]), "path": str(it["path"]),
+                                      "score": float(it["score"]), "last": float(it["last"])}
+            except (TypeError, ValueError, KeyError):
+                continue  # skip malformed entries rather than fail at startup
+        self._reindex()
+
+    def _save(self):
+        with self.lock:
+            items = dict(self.items)
+        _write_json_atomic(self.path, items, "Hot")
+
+HOT_TARGETS = HotTargets(HOT_TARGETS_PATH, HOT_TARGETS_SIZE)
+
+# ──────────────────────────────────────────────────────────────────
+# Tracing
+# ──────────────────────────────────────────────────────────────────
+# Each utterance gets a Trace; code anywhere on its path times itself with
+# `with span("stage"):` (a no-op outside a traced command). Stage timings feed
+# rolling p50/p95/p99 windows, finished traces are appended to traces.jsonl,
+# and the aggregate is pushed to the web UI (ui_server GET /metrics).
+TRACE_PATH = os.path.join(CACHE_DIR, "traces.jsonl")
+TRACE_WINDOW = 500
+METRICS_PUSH_S = 5.0
+_TRACE = contextvars.ContextVar("trace", default=None)
+
+class Trace:
+    _ids = itertools.count(1)
+
+    def __init__(self, started=None):
+        self.id = next(self._ids)
+        self.t0 = started or time.perf_counter()
+        self.wall = time.time() - (time.perf_counter() - self.t0)
+        self.spans = {}
+        self.meta = {}
+        self.speech_gen = SPEECH.gen
+
+    def add(self, stage, ms):
+        self.spans[stage] = self.spans.get(stage, 0.0) + ms
+        TRACER.record(stage, ms)
+
+def _pct(v, p):
+    """p-quantile of the sorted samples v, interpolated between neighbours."""
+    k = (len(v) - 1) * p
+    i = int(k)
+    return v[i] + (v[min(i + 1, len(v) - 1)] - v[i]) * (k - i)
+
+class Tracer:
+    def __init__(self, path, window=TRACE_WINDOW):
+        self.path, self.window = path, window
+        self.samples = {}  # stage -> deque of recent ms
+        self.lock = threading.Lock()
+
+    def record(self, stage, ms):
+        with self.lock:
+            q = self.samples.get(stage)
+            if q is None: q = self.samples[stage] = deque(maxlen=self.window)
+            q.append(ms)
+
+    def finish(self, trace, outcome):
+        total = (time.perf_counter() - trace.t0) * 1000
+        trace.add("total", total)
+        line = json.dumps({"id": trace.id, "ts": round(trace.wall, 3), "outcome": outcome,
+                           "total_ms": round(total, 2), **trace.meta,
+                           "spans": {k: round(v, 2) for k, v in trace.spans.items()}})
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f: f.write(line + "\n")
+        except OSError as e:
+            print("[Trace] Could not write:", e)
+
+    def percentiles(self):
+        with self.lock:
+            snap = {k: sorted(v) for k, v in self.samples.items()}
+        return {k: {"n": len(v), "p50": round(_pct(v, .5), 1), "p95": round(_pct(v, .95), 1),
+                    "p99": round(_pct(v, .99), 1), "max": round(v[-1], 1)}
+                for k, v in snap.items() if v}
+
+TRACER = Tracer(TRACE_PATH)
+
+@contextlib.contextmanager
+def span(stage):
+    trace = _TRACE.get()
+    if trace is None:
+        yield; return
+    t0 = time.perf_counter()
+    try: yield
+    finally: trace.add(stage, (time.perf_counter() - t0) * 1000)
+
+def metrics_snapshot():
+    snap = {"type": "metrics", "stages": TRACER.percentiles(), "startup_ms": STARTUP_MS,
+            "nlu_cache": NLU_CACHE.stats(), "nlu_prompt": prompt_stats(),
+            "hot_targets": HOT_TARGETS.stats(), "tts": SPEECH.stats(),
+            "backends": backend_stats(), "prewarm": {k: PREWARM[k] for k in ("runs", "skipped")},
+            "publisher": PUBLISHER.stats()}
+    if PIPELINE: snap["pipeline"] = PIPELINE.snapshot()
+    return snap
+
+def metrics_worker():
+    last = None
+    while True:
+        time.sleep(METRICS_PUSH_S)
+        snap = metrics_snapshot()
+        if snap != last:
+            last = snap
+            PUBLISHER.publish(snap)
+
+# ──────────────────────────────────────────────────────────────────
+# API backends
+# ──────────────────────────────────────────────────────────────────
+# Transcription and chat calls go through call_api(): each call has a deadline
+# (retries included) and a small retry budget for connection errors, timeouts,
+# 429s and 5xx. If an alternate backend is configured (JARVIS_ASR_ALT /
+# JARVIS_NLU_ALT = "model" or "model@base_url", e.g. a second model or a local
+# stand-in), the request is also sent there once the primary has taken longer
+# than its recent p95 (but never more than HEDGE_P50_CAP times its p50, so a
+# few slow samples can't push the hedge out of reach), or right away if the
+# primary fails; the first good answer wins. Latency, wins and failures per backend go to /metrics.
+ASR_DEADLINE_S = float(os.getenv("JARVIS_ASR_DEADLINE", "10"))
+NLU_DEADLINE_S = float(os.getenv("JARVIS_NLU_DEADLINE", "8"))
+API_RETRIES = int(os.getenv("JARVIS_API_RETRIES", "1"))
+HEDGE_MIN_S = 0.1
+HEDGE_DEFAULT_S = 1.0   # until there are HEDGE_MIN_SAMPLES latencies to take a p95 of
+HEDGE_MIN_SAMPLES = 20
+HEDGE_P50_CAP = 2.0
+API_POOL = ThreadPoolExecutor(max_workers=8, thread_name_prefix="api")
+
+class ApiError(Exception):
+    pass
+
+class Backend:
+    """One OpenAI-compatible endpoint + model, with its own latency window."""
+    def __init__(self, kind, model, base_url=None):
+        self.kind, self.model, self.base_url = kind, model, base_url
+        self.name = f"{kind}:{model}" + (f"@{urllib.parse.urlsplit(base_url).netloc}" if base_url else "")
+        self.lat = deque(maxlen=TRACE_WINDOW)
+        self.counts = {"races": 0, "wins": 0, "hedges": 0, "errors": 0, "timeouts": 0}
+        self._client = None
+
+    @classmethod
+    def from_spec(cls, kind, spec):
+        model, _, base_url = spec.partition("@")
+        return cls(kind, model.strip(), base_url.strip() or None)
+
+    def client(self):
+        if self._client is None:
+            if self.base_url is None:
+                base = get_client()
+            else:
+                from openai import OpenAI
+                base = OpenAI(api_key=os.getenv("JARVIS_ALT_API_KEY") or API_KEY or "none",
+                              base_url=self.base_url, http_client=http_client())
+            self._client = base.with_options(max_retries=0)  # call_api does the retrying
+        return self._client
+
+    def hedge_delay(self, deadline_s):
+        if len(self.lat) < HEDGE_MIN_SAMPLES:
+            delay = HEDGE_DEFAULT_S
+        else:
+            v = sorted(self.lat)
+            delay = min(_pct(v, .95), HEDGE_P50_CAP * _pct(v, .5)) / 1000
+        return min(max(delay, HEDGE_MIN_S), deadline_s / 2)
+
+    def stats(self):
+        v = sorted(self.lat)
+        pct = lambda p: round(_pct(v, p), 1) if v else None
+        races = self.counts["races"]
+        return {**self.counts, "win_rate": round(self.counts["wins"] / races, 3) if races else None,
+                "p50": pct(.5), "p95": pct(.95), "p99": pct(.99)}
+
+def _backends(kind, model, alt):
+    out = [Backend(kind, model, os.getenv(f"JARVIS_{kind.upper()}_BASE_URL") or None)]
+    if alt: out.append(Backend.from_spec(kind, alt))
+    return out
+ASR_BACKENDS = _backends("asr", os.getenv("JARVIS_ASR_MODEL", "whisper-1"), os.getenv("JARVIS_ASR_ALT"))
+NLU_BACKENDS = _backends("nlu", os.getenv("JARVIS_NLU_MODEL", "gpt-4o-mini"), os.getenv("JARVIS_NLU_ALT"))
+
+def _retryable(e):
+    status = getattr(e, "status_code", None)
+    return status is None or status == 429 or status >= 500
+
+def _attempt(backend, request, timeout):
+    t0 = time.perf_counter()
+    try:
+        result = request(backend, timeout)
+    except Exception:
+        backend.counts["errors"] += 1
+        raise
+    backend.lat.append((time.perf_counter() - t0) * 1000)
+    return result
+
+def call_api(backends, request, deadline_s):
+    """First good result of request(backend, timeout) across backends.
+
+    Returns (result, backend); raises ApiError once the deadline passes or
+    every attempt has failed."""
+    primary, alt = backends[0], (backends[1] if len(backends) > 1 else None)
+    end = time.perf_counter() + deadline_s
+    running, errors, retries = {}, [], API_RETRIES
+    def launch(b):
+        running[API_POOL.submit(_attempt, b, request, max(0.05, end - time.perf_counter()))] = b
+    def hedge():
+        alt.counts["races"] += 1; alt.counts["hedges"] += 1
+        launch(alt)
+    primary.counts["races"] += 1
+    launch(primary)
+    hedge_at = time.perf_counter() + primary.hedge_delay(deadline_s) if alt else None
+    while running:
+        now = time.perf_counter()
+        if now >= end: break
+        timeout = end - now if hedge_at is None else max(0.0, min(end, hedge_at) - now)
+        done, _ = wait(list(running), timeout=timeout, return_when=FIRST_COMPLETED)
+        for f in done:
+            b = running.pop(f)
+            try:
+                result = f.result()
+            except Exception as e:
+                errors.append(e)
+                ui_log(f"[api] {b.name}: {type(e).__name__}: {e}")
+                if retries > 0 and _retryable(e) and end - time.perf_counter() > HEDGE_MIN_S:
+                    retries -= 1; launch(b)
+                elif hedge_at is not None:
+                    hedge_at = None; hedge()  # fail over now
+                continue
+            b.counts["wins"] += 1
+            return result, b
+        if hedge_at is not None and time.perf_counter() >= hedge_at:
+            hedge_at = None; hedge()
+    for b in set(running.values()): b.counts["timeouts"] += 1
+    if running or not errors:
+        raise ApiError(f"no {primary.kind} answer within {deadline_s:g} s")
+    raise ApiError(f"{primary.kind} request failed ({type(errors[-1]).__name__})")
+
+def backend_stats():
+    return {b.name: b.stats() for b in ASR_BACKENDS + NLU_BACKENDS}
+
+# Pressing the hotkey opens (or refreshes) a pooled connection to every backend
+# with a cheap GET /models, so the handshake overlaps speech capture instead of
+# delaying the transcription upload. At most once per PREWARM_DEBOUNCE_S.
+PREWARM_DEBOUNCE_S = float(os.getenv("JARVIS_PREWARM_DEBOUNCE", "10"))
+PREWARM = {"last": None, "runs": 0, "skipped": 0}
+
+def prewarm_api():
+    now = time.perf_counter()
+    if PREWARM["last"] is not None and now - PREWARM["last"] < PREWARM_DEBOUNCE_S:
+        PREWARM["skipped"] += 1; return
+    PREWARM["last"] = now
+    API_POOL.submit(_prewarm)
+
+def _prewarm():
+    t0, seen = time.perf_counter(), set()
+    for b in ASR_BACKENDS + NLU_BACKENDS:
+        if b.base_url in seen: continue  # backends on one endpoint share a pool
+        seen.add(b.base_url)
+        try: b.client().models.list(timeout=5)
+        except Exception as e: ui_log(f"[prewarm] {b.name}: {type(e).__name__}: {e}")
+    PREWARM["runs"] += 1
+    TRACER.record("prewarm", (time.perf_counter() - t0) * 1000)
+
 # ──────────────────────────────────────────────────────────────────
 # NLU + Whisper
 # ──────────────────────────────────────────────────────────────────
-def build_system_prompt():
-    intents = list(ACTIONS.keys())
+def build_system_prompt(intents=None):
+    intents = list(ACTIONS.keys()) if intents is None else list(intents)
     return (
         "You are Jarvis, a witty, warm desktop assistant. "
         "Be friendly and slightly humorous.\n"
@@ -332,51 +1280,435 @@ def build_system_prompt():
     )
 SYSTEM_PROMPT = build_system_prompt()
 
+# Local fast-path: utterances that plainly name an intent (or one of its
+# optional `triggers:` in actions.yaml) are dispatched without an LLM call.
+FAST_INTENT_THRESHOLD = float(os.getenv("JARVIS_FAST_THRESHOLD", "90"))
+_FILLER = {"jarvis", "hey", "ok", "okay", "please", "the", "my", "a", "for", "me", "can", "you"}
+
+def _phrase(s, drop=()):
+    words = re.sub(r"[^\w\s]|_", " ", str(s).lower()).split()
+    return " ".join(w for w in words if w not in drop)
+
+def _intent_phrases(name, spec):
+    triggers = spec.get("triggers") if isinstance(spec, dict) else None
+    if isinstance(triggers, str): triggers = [triggers]
+    return [name] + list(triggers or [])
+
+class IntentMatcher:
+    """Fuzzy matcher over intent names + trigger phrases, rebuilt on reload."""
+    def __init__(self, actions):
+        self.phrases, self.intents = [], []
+        for name, spec in actions.items():
+            for p in dict.fromkeys(_phrase(t, _FILLER) for t in _intent_phrases(name, spec)):
+                if p:
+                    self.phrases.append(p); self.intents.append(name)
+
+    def match(self, text):
+        """Best (intent, score) for text; (None, 0) if nothing comes close.
+
+        A whole-phrase ratio alone is too loose on short phrases ("block pc"
+        scores 93 against "lock pc"), so every word on either side must also
+        have a counterpart: an exact match, or a close one for longer words."""
+        q = _phrase(text, _FILLER)
+        if not q or not self.phrases: return None, 0
+        from rapidfuzz import process, fuzz
+        for phrase, score, idx in process.extract(q, self.phrases, scorer=fuzz.ratio, limit=5):
+            if self._words_match(q.split(), phrase.split(), fuzz):
+                return self.intents[idx], score
+        return None, 0
+
+    @staticmethod
+    def _words_match(a, b, fuzz):
+        close = lambda x, y: x == y or (min(len(x), len(y)) >= 5 and fuzz.ratio(x, y) >= 85)
+        return all(any(close(x, y) for y in b) for x in a) and \
+               all(any(close(y, x) for x in a) for y in b)
+INTENT_MATCHER = IntentMatcher(ACTIONS)
+
+# Prompt shortlisting: with a large actions.yaml only the NLU_TOPK intents that
+# best match the utterance (BM25 over names, `description:` and `triggers:`)
+# go into the prompt. If nothing matches, the full catalog is sent instead.
+NLU_TOPK = int(os.getenv("JARVIS_NLU_TOPK", "8"))
+
+def _terms(s):
+    return [w[:-1] if len(w) > 3 and w.endswith("s") else w for w in _phrase(s, _FILLER).split()]
+
+class IntentIndex:
+    """BM25 index over each intent's name, description and trigger phrases."""
+    K1, B = 1.2, 0.75
+
+    def __init__(self, actions):
+        self.intents, self.tf, self.lens = [], [], []
+        df = Counter()
+        for name, spec in actions.items():
+            desc = spec.get("description", "") if isinstance(spec, dict) else ""
+            tf = Counter(t for p in _intent_phrases(name, spec) + [desc] for t in _terms(p))
+            self.intents.append(name); self.tf.append(tf); self.lens.append(sum(tf.values()))
+            df.update(tf.keys())
+        n = len(self.intents)
+        self.avg_len = (sum(self.lens) / n) if n else 1.0
+        self.idf = {t: math.log(1 + (n - d + 0.5) / (d + 0.5)) for t, d in df.items()}
+        self.postings = {}
+        for i, tf in enumerate(self.tf):
+            for t in tf: self.postings.setdefault(t, []).append(i)
+
+    def top(self, text, k):
+        """Up to k (intent, score) pairs that share a term with text, best first."""
+        scores = {}
+        for t in set(_terms(text)):
+            idf = self.idf.get(t)
+            if idf is None: continue
+            for i in self.postings[t]:
+                f = self.tf[i][t]
+                norm = f + self.K1 * (1 - self.B + self.B * self.lens[i] / self.avg_len)
+                scores[i] = scores.get(i, 0.0) + idf * f * (self.K1 + 1) / norm
+        best = sorted(scores.items(), key=lambda kv: -kv[1])[:k]
+        return [(self.intents[i], round(sc, 3)) for i, sc in best]
+INTENT_INDEX = IntentIndex(ACTIONS)
+
+PROMPT_STATS = {m: {"n": 0, "tokens": 0, "api_ms": 0.0} for m in ("topk", "full")}
+
+def prompt_for(text):
+    """(system prompt, mode) for one utterance: shortlisted, or the full catalog."""
+    if len(ACTIONS) > NLU_TOPK > 0:
+        hits = INTENT_INDEX.top(text, NLU_TOPK)
+        if hits: return build_system_prompt(i for i, _ in hits), "topk"
+    return SYSTEM_PROMPT, "full"
+
+def prompt_stats():
+    return {m: {"n": v["n"], "avg_tokens": round(v["tokens"] / v["n"]) if v["n"] else 0,
+                "avg_api_ms": round(v["api_ms"] / v["n"], 1) if v["n"] else 0}
+            for m, v in PROMPT_STATS.items()}
+
+def reload_actions():
+    global ACTIONS, SYSTEM_PROMPT, INTENT_MATCHER, INTENT_INDEX
+    ACTIONS = load_actions()
+    SYSTEM_PROMPT = build_system_prompt()
+    INTENT_MATCHER = IntentMatcher(ACTIONS)
+    INTENT_INDEX = IntentIndex(ACTIONS)
+    NLU_CACHE.drop_stale(SYSTEM_PROMPT)
+
+# NLU memo: repeated utterances skip the API. Keys include a hash of the system
+# prompt, so editing actions.yaml invalidates them. Only well-formed actions are
+# cached (chat replies should stay fresh).
+NLU_CACHE_PATH = os.path.join(CACHE_DIR, "nlu_cache.json")
+NLU_CACHE_SIZE = int(os.getenv("JARVIS_NLU_CACHE_SIZE", "500"))
+NLU_CACHE_TTL_S = float(os.getenv("JARVIS_NLU_CACHE_TTL", str(7 * 24 * 3600)))
+
+def _prompt_hash(prompt):
+    return hashlib.sha1(prompt.encode("utf-8")).hexdigest()[:12]
+
+class NLUCache:
+    """Bounded LRU + TTL cache of nlu_parse results, persisted to disk."""
+    def __init__(self, path, size, ttl):
+        self.path, self.size, self.ttl = path, size, ttl
+        self.items = OrderedDict()  # key -> [stored_at, result, api_ms]
+        self.lock = threading.Lock()
+        self.hits = self.misses = 0
+        self.saved_ms = 0.0
+        self._load()
+
+    @staticmethod
+    def key(text, prompt):
+        return f"{_prompt_hash(prompt)}:{_phrase(text)}"
+
+    def get(self, key):
+        with self.lock:
+            item = self.items.get(key)
+            if item and time.time() - item[0] > self.ttl:
+                del self.items[key]; item = None
+            if not item:
+                self.misses += 1
+                return None
+            self.items.move_to_end(key)
+            self.hits += 1
+            self.saved_ms += item[2]
+            return dict(item[1])
+
+    def put(self, key, result, api_ms):
+        with self.lock:
+            self.items[key] = [time.time(), result, api_ms]
+            self.items.move_to_end(key)
+            while len(self.items) > self.size:
+                self.items.popitem(last=False)
+        self._save()
+
+    def drop_stale(self, prompt):
+        """Forget entries made under a different system prompt."""
+        prefix = _prompt_hash(prompt) + ":"
+        with self.lock:
+            for k in [k for k in self.items if not k.startswith(prefix)]:
+                del self.items[k]
+        self._save()
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "size": len(self.items),
+                "hit_rate": self.hits / total if total else 0.0,
+                "saved_ms": round(self.saved_ms)}
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                items = json.load(f)
+        except (OSError, ValueError):
+            return
+        now = time.time()
+        for entry in items if isinstance(items, list) else ():
+            try:
+                k, (stored_at, result, api_ms) = entry
+                if now - float(stored_at) <= self.ttl and isinstance(result, dict):
+                    self.items[str(k)] = [float(stored_at), result, float(api_ms)]
+            except (TypeError, ValueError, IndexError, KeyError):
+                continue  # skip malformed entries rather than fail at startup
+        while len(self.items) > self.size:
+            self.items.popitem(last=False)
+
+    def _save(self):
+        with self.lock:
+            items = list(self.items.items())
+        _write_json_atomic(self.path, items, "NLU")
+
+NLU_CACHE = NLUCache(NLU_CACHE_PATH, NLU_CACHE_SIZE, NLU_CACHE_TTL_S)
+
+def _cacheable(parsed):
+    if not isinstance(parsed, dict) or parsed.get("mode") != "action": return False
+    intent, target = parsed.get("intent"), parsed.get("target")
+    if intent: return intent in ACTIONS
+    return isinstance(target, str) and bool(target.strip())
+
 def nlu_parse(text):
-    try:
-        resp = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[{"role":"system","content":SYSTEM_PROMPT},
+    key = NLU_CACHE.key(text, SYSTEM_PROMPT)
+    cached = NLU_CACHE.get(key)
+    if cached is not None:
+        st = NLU_CACHE.stats()
+        ui_log(f"[nlu] cache hit ({st['hits']}/{st['hits']+st['misses']}, ~{st['saved_ms']} ms saved)")
+        return cached
+    with span("nlu_retrieve"):
+        prompt, mode = prompt_for(text)
+    def request(b, timeout):
+        resp = b.client().chat.completions.create(
+            model=b.model,
+            messages=[{"role":"system","content":prompt},
                       {"role":"user","content":text}],
-            response_format={"type":"json_object"}
+            response_format={"type":"json_object"},
+            timeout=timeout,
         )
-        return json.loads(resp.choices[0].message.content)
-    except: return {"mode":"chat","reply":"Sorry, I got confused."}
-
-def transcribe_audio(audio_data):
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as tmp:
-        tmp.write(audio_data.get_wav_data()); tmp_path = tmp.name
+        return resp, json.loads(resp.choices[0].message.content)
+    t0 = time.perf_counter()
     try:
-        with open(tmp_path,"rb") as f:
-            tr = client.audio.transcriptions.create(model="whisper-1", file=f)
-        return tr.text
-    finally:
-        try: os.remove(tmp_path)
-        except: pass
+        with span("nlu_api"):
+            (resp, parsed), backend = call_api(NLU_BACKENDS, request, NLU_DEADLINE_S)
+    except ApiError as e:
+        ui_log(f"[nlu error] {e}")
+        raise  # the pipeline reports it; no made-up reply
+    usage = getattr(resp, "usage", None)
+    tokens = getattr(usage, "prompt_tokens", None) or (len(prompt) + len(text)) // 4
+    st = PROMPT_STATS[mode]
+    st["n"] += 1; st["tokens"] += tokens; st["api_ms"] += (time.perf_counter() - t0) * 1000
+    trace = _TRACE.get()
+    if trace: trace.meta.update(prompt={"mode": mode, "tokens": tokens}, nlu_backend=backend.name)
+    if _cacheable(parsed):
+        NLU_CACHE.put(key, parsed, (time.perf_counter() - t0) * 1000)
+    return parsed
+
+# Upload encoding: "flac" (16 kHz mono FLAC, smallest), "wav16" (16 kHz mono
+# WAV) or "wav" (raw capture). Audio never touches the disk either way.
+AUDIO_FORMAT = os.getenv("JARVIS_AUDIO_FORMAT", "flac").lower()
+AUDIO_RATE = 16000
+
+def encode_audio(audio_data, fmt=None):
+    """Named in-memory upload buffer for audio_data in the given format."""
+    fmt = fmt or AUDIO_FORMAT
+    rate = min(AUDIO_RATE, audio_data.sample_rate)
+    buf = None
+    if fmt == "flac":
+        try:
+            buf = io.BytesIO(audio_data.get_flac_data(convert_rate=rate, convert_width=2))
+            buf.name = "speech.flac"
+        except Exception as e:  # no FLAC encoder on this machine
+            print("[Audio] FLAC unavailable, sending WAV:", e)
+            fmt = "wav16"
+    if buf is None:
+        data = audio_data.get_wav_data() if fmt == "wav" else \
+               audio_data.get_wav_data(convert_rate=rate, convert_width=2)
+        buf = io.BytesIO(data)
+        buf.name = "speech.wav"
+    return buf
+
+def transcribe_audio(audio_data, fmt=None):
+    buf = encode_audio(audio_data, fmt)
+    data, name = buf.getvalue(), buf.name
+    def request(b, timeout):
+        f = io.BytesIO(data); f.name = name  # fresh buffer per attempt
+        return b.client().audio.transcriptions.create(model=b.model, file=f, timeout=timeout).text
+    text, backend = call_api(ASR_BACKENDS, request, ASR_DEADLINE_S)
+    trace = _TRACE.get()
+    if trace: trace.meta["asr_backend"] = backend.name
+    return text
 
 # ──────────────────────────────────────────────────────────────────
 # Input
 # ──────────────────────────────────────────────────────────────────
-def listen_once():
-    r = sr.Recognizer()
-    with sr.Microphone() as source:
-        ui.set_listening(True)
-        ui_log("🎤 Listening...")
-        r.adjust_for_ambient_noise(source, duration=0.3)
-        audio = r.listen(source, phrase_time_limit=6)
+# The mic stays open: a capture thread keeps the last PREROLL_S of audio in a
+# ring buffer and a rolling ambient-energy estimate, so a recording starts with
+# audio from just before the hotkey and needs no calibration pause. The end of
+# the phrase is found by energy VAD (VAD_PAUSE_S of quiet after speech).
+PREROLL_S = float(os.getenv("JARVIS_PREROLL", "0.5"))
+PHRASE_LIMIT_S = 6
+VAD_PAUSE_S = float(os.getenv("JARVIS_VAD_PAUSE", "0.7"))
+VAD_NO_SPEECH_S = 4.0
+VAD_RATIO = 2.5        # speech = energy above ambient * VAD_RATIO ...
+VAD_MIN_ENERGY = 150   # ... and above this floor
+AMBIENT_ALPHA = 0.05   # EMA weight of each new idle chunk
+
+def _rms(data, width):
+    if width != 2 or len(data) < 2: return 0.0
+    samples = array("h", data[:len(data) - len(data) % 2])
+    return math.sqrt(sum(s * s for s in samples) / len(samples))
+
+class MicStream:
+    """Always-open input stream with pre-roll and VAD end-of-speech.
+
+    `source` is anything shaped like an opened sr.Microphone: SAMPLE_RATE,
+    SAMPLE_WIDTH, CHUNK and a blocking stream.read(n). Benchmarks feed a
+    synthetic source instead of a real device.
+    """
+    def __init__(self, source, preroll_s=PREROLL_S):
+        self.source = source
+        self.rate, self.width, self.chunk = source.SAMPLE_RATE, source.SAMPLE_WIDTH, source.CHUNK
+        self.chunk_s = self.chunk / self.rate
+        self.ring = deque(maxlen=max(1, round(preroll_s / self.chunk_s)))
+        self.ambient = None
+        self.live = None  # chunks collected while a recording is active
+        self.cond = threading.Condition()
+        self.running = False
+
+    def start(self):
+        self.running = True
+        threading.Thread(target=self._run, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.running = False
+
+    def _run(self):
+        while self.running:
+            try:
+                data = self.source.stream.read(self.chunk)
+            except Exception as e:
+                print("[Mic] Stream stopped:", e)
+                self.running = False
+            else:
+                energy = _rms(data, self.width)
+            with self.cond:
+                if self.running:
+                    if self.live is not None:
+                        self.live.append((data, energy))
+                    else:
+                        self.ring.append((data, energy))
+                        if self.ambient is None:
+                            self.ambient = energy
+                        elif energy <= self.threshold():  # don't learn speech as noise
+                            self.ambient += AMBIENT_ALPHA * (energy - self.ambient)
+                self.cond.notify_all()
+
+    def threshold(self):
+        return max(VAD_MIN_ENERGY, (self.ambient or 0.0) * VAD_RATIO)
+
+    def record(self, held=None, phrase_limit=PHRASE_LIMIT_S, pause_s=VAD_PAUSE_S,
+               no_speech_s=VAD_NO_SPEECH_S):
+        """Pre-roll + live audio until the phrase ends, as sr.AudioData.
+
+        While held() is true (push-to-talk key down) a pause doesn't end it.
+        """
+        with self.cond:
+            chunks = list(self.ring)
+            self.ring.clear()
+            self.live = []
+            threshold = self.threshold()
+        frames = [d for d, _ in chunks]
+        speech = any(e > threshold for _, e in chunks)
+        silent = elapsed = 0.0
+        try:
+            while elapsed < phrase_limit:
+                with self.cond:
+                    while not self.live and self.running:
+                        self.cond.wait(0.5)
+                    batch, self.live = self.live, []
+                if not batch: break  # stream died
+                for data, energy in batch:
+                    frames.append(data)
+                    elapsed += self.chunk_s
+                    if energy > threshold: speech, silent = True, 0.0
+                    elif speech: silent += self.chunk_s
+                if held and held(): continue
+                if speech and silent >= pause_s: break
+                if not speech and elapsed >= no_speech_s: break
+        finally:
+            with self.cond:
+                self.live = None
+        import speech_recognition as sr
+        return sr.AudioData(b"".join(frames), self.rate, self.width)
+
+MIC = None
+MIC_LOCK = threading.Lock()
+
+def get_mic():
+    """The shared MicStream, opening the default input device on first use."""
+    global MIC
+    with MIC_LOCK:
+        if MIC is None or not MIC.running:
+            if MIC is not None:  # stream died: release the old device first
+                MIC.stop()
+                try: MIC.source.__exit__(None, None, None)
+                except Exception as e: print("[Mic] Closing old stream:", e)
+                MIC = None
+            import speech_recognition as sr
+            source = sr.Microphone()
+            source.__enter__()
+            MIC = MicStream(source).start()
+        return MIC
+
+def warm_mic():
+    try: get_mic()
+    except Exception as e: ui_log(f"[mic] Not ready: {e}")
+    else: startup_mark("mic")
+
+def listen_once(held=None):
+    try:
+        mic = get_mic()
+    except Exception as e:
+        ui_log(f"[mic] {e}")
+        return None
+    ui.set_listening(True)
+    ui_log("🎤 Listening...")
+    try:
+        return mic.record(held=held)
+    finally:
         ui.set_listening(False)
-    return audio
 
 PTT = {"pressed":False}
 LISTEN_ENABLED = {"active":False}
 MODS = {"ctrl":False}
+# Hotkey callbacks wake the worker loop through WAKE instead of it polling;
+# KEY_TS is when the current trigger fired, for key→capture latency.
+WAKE = threading.Event()
+KEY_TS = {"t":None}
+KEY_LATENCY_MS = deque(maxlen=200)
+def _trigger():
+    if KEY_TS["t"] is None: KEY_TS["t"] = time.perf_counter()
+    SPEECH.interrupt()  # don't talk over (or into the mic during) the next command
+    prewarm_api()
+    WAKE.set()
 def on_press(key):
     if key in (keyboard.Key.ctrl, keyboard.Key.ctrl_l, keyboard.Key.ctrl_r):
         MODS["ctrl"]=True; return
-    if key==keyboard.Key.space: PTT["pressed"]=True; return
+    if key==keyboard.Key.space:
+        if not PTT["pressed"]: PTT["pressed"]=True; _trigger()
+        return
     try:
         if MODS["ctrl"] and getattr(key,"char","").lower()=="j":
-            LISTEN_ENABLED["active"]=True
+            LISTEN_ENABLED["active"]=True; _trigger()
             ui_log("[hotkey] Triggered — say your command")
     except: pass
 def on_release(key):
@@ -389,71 +1721,269 @@ def on_release(key):
 # ──────────────────────────────────────────────────────────────────
 def say(text: str):
     print("Jarvis:", text)
-    if TTS:
-        try:
-            TTS_QUEUE.put_nowait(text)
-        except queue.Full:
-            print("[TTS] Queue full — skipping speech")
+    PUBLISHER.publish({"type":"jarvis","text":text})
+    # replies belong to the command that produced them, and go stale with it
+    trace = _TRACE.get()
+    SPEECH.say(text, trace.speech_gen if trace else None)
 
 
 # ──────────────────────────────────────────────────────────────────
 # Worker loop
 # ──────────────────────────────────────────────────────────────────
-def jarvis_loop():
-    ui_log("JarvisPC ready. Hold SPACE to talk, or Ctrl+J for one-shot.")
-    keyboard.Listener(on_press=on_press,on_release=on_release).start()
-    try: last_mtime = os.path.getmtime("actions.yaml")
-    except: last_mtime = 0
-    while True:
-        try:
-            m = os.path.getmtime("actions.yaml")
-            if m!=last_mtime:
-                last_mtime = m
-                global ACTIONS, SYSTEM_PROMPT
-                ACTIONS = load_actions()
-                SYSTEM_PROMPT = build_system_prompt()
-                ui_log("[i] Reloaded actions.yaml")
-        except: pass
-
-        if PTT["pressed"] or LISTEN_ENABLED["active"]:
-            audio = listen_once(); LISTEN_ENABLED["active"]=False
-            try:
-                text = transcribe_audio(audio)
-                ui_log("You (voice): " + text)
-            except Exception as e:
-                say(f"Transcription had a hiccup: {e}")
-                time.sleep(0.4); continue
-            parsed = nlu_parse(text)
-            if parsed.get("mode") == "action":
-                intent = parsed.get("intent")
-                if intent and intent in ACTIONS:
-                    run_action(intent)
+def handle_parsed(parsed):
+    if parsed.get("mode") == "action":
+        intent = parsed.get("intent")
+        if intent and intent in ACTIONS:
+            with span("launch"): run_action(intent)
+        else:
+            target = parsed.get("target", ""); hints = parsed.get("hints", [])
+            if target:
+                with span("hot_target"): hot = HOT_TARGETS.get(target, hints)
+                if hot:
+                    ui_log(f"[hot] {target} → {hot[1]}")
+                    with span("launch"): ok = run_open_resolved(*hot)
+                    if ok: HOT_TARGETS.record(target, hints, *hot)
+                    return
+                with span("resolve_target"): kind, path = resolve_target(target, hints)
+                if path:
+                    with span("launch"): ok = run_open_resolved(kind, path)
+                    if ok: HOT_TARGETS.record(target, hints, kind, path)
                 else:
-                    target = parsed.get("target", ""); hints = parsed.get("hints", [])
-                    if target:
-                        kind, path = resolve_target(target, hints)
-                        if path:
-                            run_open_resolved(kind, path)
-                        else:
-                            # try fuzzy app open if not found via normal search
-                            if open_app_by_name(target):
-                                pass
-                            else:
-                                say(f"I couldn’t find {target}.")
+                    # try fuzzy app open if not found via normal search
+                    with span("open_app"): opened = open_app_by_name(target, hints)
+                    if opened:
+                        pass
                     else:
-                        say("Tell me which app, file, or folder to open.")
+                        say(f"I couldn’t find {target}.")
             else:
-                say(parsed.get("reply") or "Okay.")
-            time.sleep(0.4)
-        else: time.sleep(0.1)
+                say("Tell me which app, file, or folder to open.")
+    else:
+        say(parsed.get("reply") or "Okay.")
+
+def parse_text(text):
+    """Route a transcript: local intent match first, LLM only as fallback."""
+    with span("fast_match"):
+        intent, score = INTENT_MATCHER.match(text)
+    if intent and score >= FAST_INTENT_THRESHOLD:
+        ui_log(f"[fast] {intent} (score {score:.0f})")
+        return {"mode":"action","intent":intent}
+    t0 = time.perf_counter()
+    parsed = nlu_parse(text)
+    ui_log(f"[nlu] {(time.perf_counter()-t0)*1000:.0f} ms"
+           + (f" (local best {intent} {score:.0f})" if intent else ""))
+    return parsed
+
+# Voice pipeline: transcribe → nlu → dispatch run as separate asyncio stages
+# with bounded queues between them, so the next utterance is captured while
+# earlier ones are still waiting on the network. Dispatch stays in capture
+# order. A "cancel"/"never mind" utterance drops everything still in flight;
+# with JARVIS_PIPELINE_POLICY=latest every new capture does.
+PIPELINE_STAGES = ("transcribe", "nlu", "dispatch")
+STAGE_TIMEOUTS_S = {"transcribe": 20.0, "nlu": 15.0, "dispatch": 10.0}
+PIPELINE_DEPTH = 4
+PIPELINE_POLICY = os.getenv("JARVIS_PIPELINE_POLICY", "chain")
+CANCEL_PHRASES = {"cancel", "never mind", "nevermind", "forget it", "stop"}
+
+class Job:
+    def __init__(self, seq, audio, trace=None):
+        self.seq, self.audio = seq, audio
+        self.trace = trace or Trace()
+        self.text = self.parsed = None
+        self.task = None
+        self.stage_ms = {}
+
+class VoicePipeline:
+    def __init__(self, stages=None):
+        self.fns = stages or {"transcribe": self._transcribe, "nlu": self._nlu,
+                              "dispatch": self._dispatch}
+        self.loop = asyncio.new_event_loop()
+        self.queues = {}
+        self.seq = 0
+        self.cancel_below = 0
+        self.inflight = {}
+        self.stats = {st: {"done": 0, "failed": 0, "timeouts": 0, "cancelled": 0,
+                           "last_ms": 0.0, "total_ms": 0.0} for st in PIPELINE_STAGES}
+        self.ready = threading.Event()
+
+    def start(self):
+        threading.Thread(target=self.loop.run_until_complete, args=(self._main(),),
+                         daemon=True).start()
+        self.ready.wait()
+        return self
+
+    async def _main(self):
+        self.queues = {st: asyncio.Queue(PIPELINE_DEPTH) for st in PIPELINE_STAGES}
+        self.ready.set()
+        nxt = dict(zip(PIPELINE_STAGES, PIPELINE_STAGES[1:]))
+        await asyncio.gather(*(self._worker(st, nxt.get(st)) for st in PIPELINE_STAGES))
+
+    def submit(self, audio, trace=None):
+        """Queue a captured utterance (called from the capture thread).
+
+        Blocks only while the transcribe queue is full.
+        """
+        self.seq += 1
+        job = Job(self.seq, audio, trace)
+        if PIPELINE_POLICY == "latest":
+            self.cancel_before(job.seq)
+        self.inflight[job.seq] = job
+        asyncio.run_coroutine_threadsafe(self.queues["transcribe"].put(job), self.loop).result()
+        return job
+
+    def cancel_before(self, seq):
+        """Drop every in-flight job older than seq."""
+        self.cancel_below = max(self.cancel_below, seq)
+        for job in list(self.inflight.values()):
+            if job.seq < seq and job.task:
+                self.loop.call_soon_threadsafe(job.task.cancel)
+
+    def depths(self):
+        return {st: q.qsize() for st, q in self.queues.items()}
+
+    def snapshot(self):
+        out = {}
+        for st, s in self.stats.items():
+            out[st] = dict(s, depth=self.queues[st].qsize() if self.queues else 0,
+                           avg_ms=round(s["total_ms"] / s["done"], 1) if s["done"] else 0.0)
+        return out
+
+    async def _worker(self, stage, nxt):
+        q, st = self.queues[stage], self.stats[stage]
+        while True:
+            job = await q.get()
+            if job.seq < self.cancel_below:
+                st["cancelled"] += 1; self._finish(job, "cancelled"); continue
+            t0 = time.perf_counter()
+            job.task = asyncio.ensure_future(asyncio.wait_for(
+                asyncio.to_thread(self._run_stage, stage, job), STAGE_TIMEOUTS_S[stage]))
+            await asyncio.wait({job.task})
+            task, job.task = job.task, None
+            ms = (time.perf_counter() - t0) * 1000
+            job.stage_ms[stage] = ms
+            job.trace.add(stage, ms)
+            if task.cancelled():
+                st["cancelled"] += 1; self._finish(job, "cancelled"); continue
+            err = task.exception()
+            if isinstance(err, asyncio.TimeoutError):
+                st["timeouts"] += 1
+                say(f"That took too long ({stage}), skipping it.")
+                self._finish(job, "timeout"); continue
+            if err:
+                st["failed"] += 1
+                say(f"Transcription had a hiccup: {err}" if stage == "transcribe"
+                    else f"Something went wrong: {err}")
+                self._finish(job, "error"); continue
+            st["done"] += 1; st["last_ms"] = ms; st["total_ms"] += ms
+            if nxt and task.result() is not False:
+                await self.queues[nxt].put(job)
+            else:
+                self._finish(job, "ok")
+
+    def _run_stage(self, stage, job):
+        _TRACE.set(job.trace)  # spans inside the stage land on this job's trace
+        return self.fns[stage](job)
+
+    def _finish(self, job, outcome):
+        self.inflight.pop(job.seq, None)
+        if job.text is not None: job.trace.meta["text"] = job.text
+        TRACER.finish(job.trace, outcome)
+        stages = " ".join(f"{k} {v:.0f}ms" for k, v in job.stage_ms.items())
+        depth = "/".join(str(d) for d in self.depths().values())
+        ui_log(f"[pipe] #{job.seq} {outcome}: {stages} (queues {depth})")
+
+    # stage bodies run on worker threads; returning False ends the job early
+    def _transcribe(self, job):
+        job.text = transcribe_audio(job.audio)
+        ui_log("You (voice): " + job.text, {"type":"asr","text":job.text})
+        if _phrase(job.text) in CANCEL_PHRASES:
+            self.cancel_before(job.seq)
+            say("Okay, cancelled.")
+            return False
+
+    def _nlu(self, job):
+        job.parsed = parse_text(job.text)
+
+    def _dispatch(self, job):
+        handle_parsed(job.parsed)
+
+PIPELINE = None
+
+ACTIONS_POLL_S = 1.0
+
+def _file_digest(path):
+    try:
+        with open(path, "rb") as f: return hashlib.sha1(f.read()).hexdigest()
+    except OSError: return None
+
+def actions_watcher(path="actions.yaml"):
+    """Reload ACTIONS (and everything built from it) when the file content changes."""
+    last_mtime, last_digest = None, _file_digest(path)
+    while True:
+        time.sleep(ACTIONS_POLL_S)
+        try: m = os.path.getmtime(path)
+        except OSError: continue
+        if m == last_mtime: continue
+        last_mtime = m
+        digest = _file_digest(path)
+        if digest and digest != last_digest:
+            last_digest = digest
+            reload_actions()
+            ui_log("[i] Reloaded actions.yaml")
+            PUBLISHER.publish({"type":"intents","list":list(ACTIONS)})
+
+def jarvis_loop():
+    global PIPELINE, keyboard
+    from pynput import keyboard
+    keyboard.Listener(on_press=on_press,on_release=on_release).start()
+    startup_mark("hotkeys")
+    PIPELINE = VoicePipeline().start()
+    ui_log("JarvisPC ready. Hold SPACE to talk, or Ctrl+J for one-shot.",
+           {"type":"status","value":"jarvis_ready"})
+    PUBLISHER.publish({"type":"intents","list":list(ACTIONS)})
+    threading.Thread(target=actions_watcher, daemon=True).start()
+    threading.Thread(target=metrics_worker, daemon=True).start()
+    while True:
+        # a pending KEY_TS also counts, so a quick SPACE tap isn't lost
+        if not (PTT["pressed"] or LISTEN_ENABLED["active"] or KEY_TS["t"] is not None):
+            WAKE.wait(); WAKE.clear()
+            continue
+        trace = Trace(KEY_TS["t"])
+        if KEY_TS["t"] is not None:
+            KEY_LATENCY_MS.append((time.perf_counter() - KEY_TS["t"]) * 1000)
+            KEY_TS["t"] = None
+            trace.add("key_to_capture", KEY_LATENCY_MS[-1])
+            ui_log(f"[lat] key→capture {KEY_LATENCY_MS[-1]:.1f} ms")
+        held = (lambda: PTT["pressed"]) if PTT["pressed"] else None
+        t0 = time.perf_counter()
+        audio = listen_once(held); LISTEN_ENABLED["active"]=False
+        if audio is None:  # mic unavailable; don't spin while the key is held
+            time.sleep(1.0); continue
+        trace.add("capture", (time.perf_counter() - t0) * 1000)
+        PIPELINE.submit(audio, trace)
 
 # ──────────────────────────────────────────────────────────────────
 # Main
 # ──────────────────────────────────────────────────────────────────
+def start_app_index():
+    # serve the cached app index at once, then refresh it in background
+    if load_app_index_cache():
+        startup_mark("app_index (cached)")
+        ui_log(f"[i] Loaded {len(APP_INDEX)} apps from cache, refreshing...")
+    else:
+        ui_log("[i] Indexing apps in Start Menu & Program Files...")
+    build_app_index()
+    startup_mark("app_index")
+
 if __name__=="__main__":
     ui = JarvisUI()
-    # build the application index in background so "open photoshop" works
-    threading.Thread(target=build_app_index, daemon=True).start()
-    ui_log("[i] Indexing apps in Start Menu & Program Files...")
+    startup_mark("window")
+    PUBLISHER.start()
+    # hotkeys first; everything slow comes up on its own thread and reports
+    # "[ready] <part> +N ms" in the log when done
     threading.Thread(target=jarvis_loop, daemon=True).start()
+    if TTS_BACKEND != "off": threading.Thread(target=SPEECH.run, daemon=True).start()
+    threading.Thread(target=warm_client, daemon=True).start()
+    threading.Thread(target=warm_mic, daemon=True).start()  # open the mic ahead of the first command
+    threading.Thread(target=start_app_index, daemon=True).start()
+    threading.Thread(target=file_index_worker, daemon=True).start()
     ui.loop()
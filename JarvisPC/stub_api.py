@@ -0,0 +1,171 @@
+"""
+Local stand-in for the OpenAI endpoints Jarvis uses.
+
+Serves just enough of the API to exercise the assistant without network
+access or an API key:
+
+  - POST `/v1/audio/transcriptions` answers with a canned transcript.
+  - POST `/v1/chat/completions` answers with a JSON intent derived from the
+    user message ("open X" becomes an action targeting X, anything else chat).
+  - GET `/v1/models` returns a tiny model list.
+  - GET `/stats` reports request counts, bytes received and connections.
+
+Every response can be delayed to mimic network/model latency, and chat
+requests additionally by prompt size (--token-ms per 1k prompt tokens); a
+fraction of requests (--tail-p) can be made much slower (--tail) to exercise
+hedging, and a fraction (--fail-p) answered with HTTP 500. --connect-ms
+stands in for the TCP + TLS handshake: each new connection's first request
+is held back by that much.
+
+To run it standalone:
+
+  $ python stub_api.py --port 8799 --latency 300
+
+then point Jarvis at it with OPENAI_BASE_URL=http://127.0.0.1:8799/v1.
+"""
+
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class StubState:
+    """Counters shared by all handler threads of one server."""
+
+    def __init__(self, latency_ms=0.0, jitter_ms=0.0, transcript="open downloads", token_ms=0.0,
+                 tail_ms=0.0, tail_p=0.0, fail_p=0.0, connect_ms=0.0):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.token_ms = token_ms
+        self.tail_ms, self.tail_p, self.fail_p = tail_ms, tail_p, fail_p
+        self.connect_ms = connect_ms
+        self.transcript = transcript
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.connections = 0
+            self.requests = {}
+            self.bytes_in = {}
+
+    def record(self, path, nbytes):
+        with self.lock:
+            self.requests[path] = self.requests.get(path, 0) + 1
+            self.bytes_in[path] = self.bytes_in.get(path, 0) + nbytes
+
+    def snapshot(self):
+        with self.lock:
+            return {"connections": self.connections, "requests": dict(self.requests),
+                    "bytes_in": dict(self.bytes_in)}
+
+    def delay(self, extra_ms=0.0):
+        ms = self.latency_ms + random.uniform(0, self.jitter_ms) + extra_ms
+        if random.random() < self.tail_p:
+            ms += self.tail_ms
+        if ms > 0:
+            time.sleep(ms / 1000)
+
+
+def _chat_reply(body):
+    try:
+        text = json.loads(body)["messages"][-1]["content"]
+    except (ValueError, KeyError, IndexError, TypeError):
+        text = ""
+    m = re.match(r"\s*(?:please\s+)?(?:open|launch|start)\s+(.+?)[.!?]*\s*$", text, re.I)
+    if m:
+        return {"mode": "action", "target": m.group(1)}
+    return {"mode": "chat", "reply": "Stub here, all good."}
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real API
+    state: StubState = None
+
+    def setup(self):
+        super().setup()
+        with self.state.lock:
+            self.state.connections += 1
+        if self.state.connect_ms > 0:
+            time.sleep(self.state.connect_ms / 1000)
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, obj, status=200):
+        data = json.dumps(obj).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        self.state.record(self.path, 0)
+        if self.path == "/stats":
+            return self._send(self.state.snapshot())
+        if self.path.rstrip("/").endswith("/models"):
+            self.state.delay()
+            return self._send({"object": "list", "data": [{"id": "whisper-1", "object": "model"},
+                                                          {"id": "gpt-4o-mini", "object": "model"}]})
+        self._send({"error": {"message": "not found"}}, 404)
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        self.state.record(self.path, len(body))
+        chat = self.path.endswith("/chat/completions")
+        self.state.delay(self.state.token_ms * len(body) / 4000 if chat else 0.0)
+        if random.random() < self.state.fail_p:
+            return self._send({"error": {"message": "stub failure", "type": "server_error"}}, 500)
+        if self.path.endswith("/audio/transcriptions"):
+            return self._send({"text": self.state.transcript})
+        if chat:
+            content = json.dumps(_chat_reply(body))
+            return self._send({
+                "id": "chatcmpl-stub", "object": "chat.completion", "created": int(time.time()),
+                "model": "gpt-4o-mini",
+                "choices": [{"index": 0, "finish_reason": "stop",
+                             "message": {"role": "assistant", "content": content}}],
+                "usage": {"prompt_tokens": len(body) // 4, "completion_tokens": len(content) // 4,
+                          "total_tokens": (len(body) + len(content)) // 4},
+            })
+        self._send({"error": {"message": "not found"}}, 404)
+
+
+def start_stub(host="127.0.0.1", port=0, **state_kw):
+    """Start a stub server on a background thread. Returns (server, state, base_url)."""
+    state = StubState(**state_kw)
+    handler = type("BoundStubHandler", (StubHandler,), {"state": state})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, state, f"http://{host}:{server.server_address[1]}/v1"
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8799)
+    ap.add_argument("--latency", type=float, default=0.0, help="added latency per request (ms)")
+    ap.add_argument("--jitter", type=float, default=0.0, help="extra random latency (ms)")
+    ap.add_argument("--token-ms", type=float, default=0.0, help="chat latency per 1k prompt tokens (ms)")
+    ap.add_argument("--tail", type=float, default=0.0, help="extra latency for slow requests (ms)")
+    ap.add_argument("--tail-p", type=float, default=0.0, help="fraction of slow requests")
+    ap.add_argument("--fail-p", type=float, default=0.0, help="fraction of requests failing with 500")
+    ap.add_argument("--connect-ms", type=float, default=0.0, help="simulated handshake per connection (ms)")
+    ap.add_argument("--transcript", default="open downloads")
+    args = ap.parse_args()
+    server, _, url = start_stub(args.host, args.port, latency_ms=args.latency,
+                                jitter_ms=args.jitter, transcript=args.transcript,
+                                token_ms=args.token_ms, tail_ms=args.tail, tail_p=args.tail_p,
+                                fail_p=args.fail_p, connect_ms=args.connect_ms)
+    print(f"Stub API listening on {url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -4,13 +4,18 @@ FastAPI server to power the modern Jarvis web UI.
 This tiny server exposes two endpoints:
 
   - GET `/` serves the main UI HTML page.
-  - POST `/event` accepts JSON events from the assistant and queues them
-    for broadcast to connected web socket clients.
-  - WebSocket `/ws` streams events down to the browser in real time.
+  - POST `/event` accepts JSON events from the assistant and broadcasts
+    them to connected web socket clients.
+  - POST `/events` does the same for a JSON array of events (the assistant
+    batches its log lines this way).
+  - GET `/metrics` returns the assistant's latest per-stage latency
+    percentiles (it pushes them as `metrics` events) and hub counters.
+  - WebSocket `/ws` streams events down to the browser in real time; a
+    new connection first receives the most recent events.
 
-To run this server locally:
+To run this server locally, from the repository root (it serves ./ui):
 
-  $ uvicorn ui_server:app --host 127.0.0.1 --port 8787 --reload
+  $ uvicorn --app-dir JarvisPC ui_server:app --host 127.0.0.1 --port 8787 --reload
 
 Then visit http://127.0.0.1:8787 in your browser to see the overlay.
 
@@ -20,6 +25,7 @@ See `ui/index.html` for the corresponding frontend implementation.
 import asyncio
 import json
 import os
+from collections import deque
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect, Request
 from fastapi.responses import FileResponse
 from fastapi.staticfiles import StaticFiles
@@ -29,9 +35,96 @@ app = FastAPI()
 # Serve static files out of the ./ui directory
 app.mount("/ui", StaticFiles(directory="ui"), name="ui")
 
-# In-memory queue of events and set of connected clients
-clients: set[WebSocket] = set()
-queue: asyncio.Queue = asyncio.Queue()
+REPLAY_SIZE = int(os.getenv("JARVIS_UI_REPLAY", "50"))
+CLIENT_QUEUE_SIZE = int(os.getenv("JARVIS_UI_CLIENT_QUEUE", "256"))
+SEND_TIMEOUT_S = 5.0
+# Event types that describe current state rather than history: the latest of
+# each is always sent to a new client, even once it has left the replay log.
+STICKY_TYPES = ("status", "intents", "metrics")
+# these are only ever state, so they are kept out of the replay log entirely
+STATE_ONLY_TYPES = ("intents", "metrics")
+
+
+class Hub:
+    """Fan-out of assistant events to every connected websocket.
+
+    Each event is serialized once. Every client has its own bounded send
+    queue drained by its own task, so a slow browser only delays itself:
+    when its queue is full the oldest pending event is dropped. A client
+    whose send stalls for SEND_TIMEOUT_S is disconnected. The last
+    REPLAY_SIZE events are replayed to newly connected clients, followed by
+    the latest event of each STICKY_TYPES type.
+    """
+
+    def __init__(self, replay: int = REPLAY_SIZE, queue_size: int = CLIENT_QUEUE_SIZE):
+        self.clients: dict[WebSocket, asyncio.Queue] = {}
+        self.replay: deque[str] = deque(maxlen=replay)
+        self.queue_size = queue_size
+        self.published = 0
+        self.dropped = 0
+        self.metrics: dict = {}
+        self.sticky: dict[str, str] = {}  # type -> latest event of that type
+
+    def publish(self, data) -> None:
+        text = json.dumps(data)
+        kind = data.get("type") if isinstance(data, dict) else None
+        if kind == "metrics":
+            self.metrics = data
+        if kind in STICKY_TYPES:
+            self.sticky[kind] = text
+        if kind not in STATE_ONLY_TYPES:
+            self.replay.append(text)
+        self.published += 1
+        for q in self.clients.values():
+            self._offer(q, text)
+
+    def _offer(self, q: asyncio.Queue, text: str) -> None:
+        if q.full():
+            q.get_nowait()
+            self.dropped += 1
+        q.put_nowait(text)
+
+    def stats(self) -> dict:
+        return {"clients": len(self.clients), "published": self.published,
+                "dropped": self.dropped,
+                "max_backlog": max((q.qsize() for q in self.clients.values()), default=0)}
+
+    async def serve(self, websocket: WebSocket) -> None:
+        """Stream events to one client until it disconnects."""
+        q: asyncio.Queue = asyncio.Queue(self.queue_size)
+        for text in self.replay:
+            self._offer(q, text)
+        for text in self.sticky.values():
+            if text not in self.replay:
+                self._offer(q, text)
+        self.clients[websocket] = q
+        sender = asyncio.create_task(self._send_loop(websocket, q))
+        receiver = asyncio.create_task(self._receive_loop(websocket))
+        try:
+            await asyncio.wait({sender, receiver}, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            self.clients.pop(websocket, None)
+            sender.cancel()
+            receiver.cancel()
+
+    async def _send_loop(self, websocket: WebSocket, q: asyncio.Queue) -> None:
+        try:
+            while True:
+                text = await q.get()
+                await asyncio.wait_for(websocket.send_text(text), SEND_TIMEOUT_S)
+        except Exception:
+            pass  # dead or stalled socket; serve() cleans up
+
+    async def _receive_loop(self, websocket: WebSocket) -> None:
+        # browsers don't send anything, but reading notices disconnects promptly
+        try:
+            while True:
+                await websocket.receive_text()
+        except (WebSocketDisconnect, Exception):
+            pass
+
+
+hub = Hub()
 
 
 @app.get("/")
@@ -40,35 +133,39 @@ async def root() -> FileResponse:
     return FileResponse("ui/index.html")
 
 
+@app.get("/metrics")
+async def metrics():
+    """Latest latency metrics pushed by the assistant, plus hub counters."""
+    return {"assistant": hub.metrics, "hub": hub.stats()}
+
+
 @app.post("/event")
 async def event(req: Request):
-    """Receive an event from the assistant and queue it for broadcast."""
+    """Receive an event from the assistant and broadcast it."""
     try:
         data = await req.json()
     except Exception:
         return {"ok": False, "error": "invalid JSON"}
-    await queue.put(data)
+    hub.publish(data)
     return {"ok": True}
 
 
+@app.post("/events")
+async def events(req: Request):
+    """Receive a batch (JSON array) of events and broadcast them in order."""
+    try:
+        data = await req.json()
+    except Exception:
+        return {"ok": False, "error": "invalid JSON"}
+    if not isinstance(data, list):
+        return {"ok": False, "error": "expected a JSON array"}
+    for item in data:
+        hub.publish(item)
+    return {"ok": True, "count": len(data)}
+
+
 @app.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
     """Accept a websocket connection and forward events."""
     await websocket.accept()
-    clients.add(websocket)
-    try:
-        while True:
-            data = await queue.get()
-            # broadcast to all clients
-            dead: list[WebSocket] = []
-            for ws in list(clients):
-                try:
-                    await ws.send_text(json.dumps(data))
-                except WebSocketDisconnect:
-                    dead.append(ws)
-                except Exception:
-                    dead.append(ws)
-            for d in dead:
-                clients.discard(d)
-    except Exception:
-        clients.discard(websocket)
+    await hub.serve(websocket)